@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Memory and allocation benchmark for SchedulingLogic.
+
+Measures retained bytes per tracked pod after initialize() and the number of
+allocations per event while pods churn through handle_event().
+
+Usage:
+    python benchmarks/bench_memory.py [--pods 10000] [--nodes 1000] [--events 200]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Tuple
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scheduler'))
+
+from scheduling_logic import SchedulingLogic
+
+
+def _pod(i: int, node_name=None) -> dict:
+    """Pod dict with realistic repetition: few namespaces, gangs of 4 for every tenth pod."""
+    return {
+        "uid": f"uid-{i:08d}",
+        "name": f"pod-{i}",
+        "namespace": f"team-{i % 20}",
+        "priority": i % 100,
+        "gang_name": f"gang-{i // 40}" if i % 10 == 0 else None,
+        "node_name": node_name
+    }
+
+
+def measure_retained(num_pods: int, num_nodes: int) -> float:
+    """Bytes retained by SchedulingLogic per tracked pod."""
+    nodes = [f"node-{i}" for i in range(num_nodes)]
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    logic = SchedulingLogic()
+    logic.initialize(nodes, (_pod(i, nodes[i] if i < num_nodes else None) for i in range(num_pods)))
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del logic
+    return retained / num_pods
+
+
+def measure_churn(num_pods: int, num_nodes: int, num_events: int) -> Tuple[float, float]:
+    """
+    Cost of ADDED/DELETED churn of low-priority pending pods.
+
+    Returns:
+        (microseconds per event, mean transient bytes allocated per event above the steady state)
+    """
+    nodes = [f"node-{i}" for i in range(num_nodes)]
+    logic = SchedulingLogic()
+    logic.initialize(nodes, (_pod(i, nodes[i] if i < num_nodes else None) for i in range(num_pods)))
+    events = []
+    for i in range(num_pods, num_pods + num_events // 2):
+        pod = _pod(i)
+        pod["priority"] = -1  # Below everything, so churn does not cause preemptions
+        events.append({"event_type": "ADDED", "pod": pod})
+        events.append({"event_type": "DELETED", "pod": pod})
+
+    start = time.perf_counter()
+    for event in events:
+        logic.handle_event(event)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    transient = 0
+    for event in events:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        logic.handle_event(event)
+        transient += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+
+    return elapsed / len(events) * 1e6, transient / len(events)
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="SchedulingLogic memory benchmark")
+    parser.add_argument("--pods", type=int, default=10000)
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.getLogger("scheduling_logic").setLevel(logging.WARNING)
+
+    print(f"Retained per pod: {measure_retained(args.pods, args.nodes):.0f} bytes "
+          f"({args.pods} pods, {args.nodes} nodes)")
+    micros, transient = measure_churn(args.pods, args.nodes, args.events)
+    print(f"Churn: {micros:.1f} us per event, {transient / 1024:.1f} KiB transient allocation per event "
+          f"({args.events} events)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Plan construction benchmark for SchedulingLogic.
+
+Times _create_scheduling_plan() on a large pending queue.
+
+Usage:
+    python benchmarks/bench_plan.py [--pods 100000] [--nodes 5000] [--repeat 20]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scheduler'))
+
+from scheduling_logic import SchedulingLogic
+
+
+def _pod(i: int) -> dict:
+    """Pending pod; every tenth pod belongs to a gang of 4."""
+    return {
+        "uid": f"uid-{i:08d}",
+        "name": f"pod-{i}",
+        "namespace": f"team-{i % 20}",
+        "priority": i % 100,
+        "gang_name": f"gang-{i // 40}" if i % 10 == 0 else None,
+        "node_name": None
+    }
+
+
+def time_plan(num_pods: int, num_nodes: int, repeat: int) -> float:
+    """Median seconds per _create_scheduling_plan() call."""
+    logic = SchedulingLogic()
+    logic.initialize([f"node-{i}" for i in range(num_nodes)], (_pod(i) for i in range(num_pods)))
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        logic._create_scheduling_plan()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Plan construction benchmark")
+    parser.add_argument("--pods", type=int, default=100000)
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger("scheduling_logic").setLevel(logging.WARNING)
+
+    seconds = time_plan(args.pods, args.nodes, args.repeat)
+    print(f"{seconds * 1000:.3f} ms per plan ({args.pods} pending pods, {args.nodes} nodes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Concurrent executor for scheduling actions.
+Runs bind/preempt actions on a thread pool while keeping per-node ordering.
+Has no Kubernetes dependencies - the adapter supplies the function that runs an action.
+"""
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ActionResult:
+    """Outcome of executing a single scheduling action."""
+    action: dict
+    success: bool
+    status: Optional[int] = None  # HTTP status of the failure, if any
+    error: Optional[str] = None
+    observed_pod: Optional[dict] = None  # Pod as read back from the cluster on a conflict
+
+    def to_dict(self) -> dict:
+        """Convert to the plain dict format consumed by SchedulingLogic.handle_action_results."""
+        return {
+            "action": self.action,
+            "success": self.success,
+            "status": self.status,
+            "observed_pod": self.observed_pod
+        }
+
+
+class ActionExecutor:
+    """
+    Executes scheduling actions concurrently with per-node ordering guarantees.
+
+    - Actions on the same node run one after another in submission order, so the
+      preempt of a node's occupant always completes before the bind to that node,
+      also across separate submit() calls
+    - Actions on different nodes run concurrently (up to max_workers)
+    - Actions are dispatched in list order, so gang binds (which the logic layer
+      emits contiguously) reach the API server together
+    - Every result is reported through the on_result callback passed to submit(),
+      except for binds dropped by cancel_stale() before they started
+    """
+
+    def __init__(self, run_action: Callable[[dict], ActionResult], max_workers: int = 8):
+        self._run_action = run_action
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="action")
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+        # node_name -> actions waiting behind the one currently running for that node.
+        # A key is present only while an action for that node is in flight.
+        self._node_chains: Dict[str, Deque[Tuple[dict, Callable[[ActionResult], None]]]] = {}
+        self._outstanding = 0
+
+        # Metrics
+        self.cancelled_stale = 0
+
+        logger.info(f"Action executor initialized with {max_workers} workers")
+
+    def submit(self, actions: List[dict], on_result: Callable[[ActionResult], None]):
+        """Queue actions for execution; on_result is called from a worker thread for each one."""
+        with self._lock:
+            for action in actions:
+                key = action.get("node_name") or action["pod_uid"]
+                self._outstanding += 1
+
+                chain = self._node_chains.get(key)
+                if chain is not None:
+                    # Another action for this node is in flight - run after it
+                    chain.append((action, on_result))
+                else:
+                    self._node_chains[key] = deque()
+                    self._pool.submit(self._run, key, action, on_result)
+
+    def _run(self, key: str, action: dict, on_result: Callable[[ActionResult], None]):
+        """Run one action, report it, then start the next queued action for the same node."""
+        try:
+            result = self._run_action(action)
+        except Exception as e:
+            logger.error(f"Unexpected error executing {action['action']} for pod "
+                         f"{action['pod_namespace']}/{action['pod_name']}: {e}", exc_info=True)
+            result = ActionResult(action=action, success=False, error=str(e))
+
+        try:
+            on_result(result)
+        except Exception as e:
+            logger.error(f"Failed to report action result: {e}", exc_info=True)
+
+        with self._lock:
+            chain = self._node_chains[key]
+            if chain:
+                next_action, next_on_result = chain.popleft()
+                self._pool.submit(self._run, key, next_action, next_on_result)
+            else:
+                del self._node_chains[key]
+
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._idle.notify_all()
+
+    def cancel_stale(self, pod_uids: Iterable[str], plan_version: int) -> Set[str]:
+        """
+        Drop queued binds for the given pods that were issued by a plan older than plan_version.
+
+        Only actions still waiting behind another action on their node are dropped;
+        running actions always complete. Preempts are never dropped.
+
+        Returns:
+            UIDs of the pods whose bind was dropped; those pods were never bound
+        """
+        pod_uids = set(pod_uids)
+        if not pod_uids:
+            return set()
+
+        cancelled = set()
+        dropped = 0
+        with self._lock:
+            for chain in self._node_chains.values():
+                stale = [entry for entry in chain
+                         if entry[0]["action"] == "bind" and entry[0]["pod_uid"] in pod_uids
+                         and entry[0].get("plan_version", plan_version) < plan_version]
+                for entry in stale:
+                    chain.remove(entry)
+                    cancelled.add(entry[0]["pod_uid"])
+                dropped += len(stale)
+
+            if dropped:
+                self._outstanding -= dropped
+                self.cancelled_stale += dropped
+                if self._outstanding == 0:
+                    self._idle.notify_all()
+
+        if dropped:
+            logger.info(f"Cancelled {dropped} queued binds made stale by plan version {plan_version}")
+        return cancelled
+
+    @property
+    def outstanding(self) -> int:
+        """Number of submitted actions that have not completed yet."""
+        with self._lock:
+            return self._outstanding
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until all submitted actions have completed.
+
+        Returns:
+            True if idle, False if the timeout expired first
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def shutdown(self):
+        """Wait for in-flight actions and stop the worker threads."""
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Node capacity models: how many pods (slots) a node offers to SchedulingLogic.
+No Kubernetes dependencies - models read a node's plain label and annotation dicts.
+"""
+
+import logging
+from typing import Dict, Optional
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class SingleSlotCapacity:
+    """One pod per node (the default)."""
+
+    def slots(self, labels: Optional[Dict[str, str]], annotations: Optional[Dict[str, str]]) -> int:
+        """Number of pod slots of a node."""
+        return 1
+
+
+class LabelSlotCapacity:
+    """
+    Slot count read from a node label or annotation, e.g. `custom-scheduler/slots: "4"`.
+
+    The label wins over the annotation. Nodes without the key, or with a value
+    that is not a positive integer, get default_slots.
+    """
+
+    def __init__(self, key: str, default_slots: int = 1):
+        self.key = key
+        self.default_slots = default_slots
+
+    def slots(self, labels: Optional[Dict[str, str]], annotations: Optional[Dict[str, str]]) -> int:
+        """Number of pod slots of a node."""
+        value = (labels or {}).get(self.key) or (annotations or {}).get(self.key)
+        if value is None:
+            return self.default_slots
+
+        try:
+            slots = int(value)
+        except ValueError:
+            slots = 0
+        if slots < 1:
+            logger.warning(f"Ignoring invalid slot count {value!r} in {self.key} - using {self.default_slots}")
+            return self.default_slots
+        return slots
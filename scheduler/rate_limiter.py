@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Client-side token-bucket rate limiter for mutating Kubernetes API calls.
+Keeps concurrent binds/preempts under a configured QPS so the API server's
+priority and fairness limits are not tripped. No Kubernetes dependencies.
+"""
+
+import logging
+import threading
+import time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `qps` per second up to `burst`. Each call to
+    acquire() takes one token, blocking until one is available. Counters expose
+    how often and how long callers were throttled, for tuning QPS.
+    """
+
+    def __init__(self, qps: float, burst: int):
+        if qps <= 0:
+            raise ValueError(f"qps must be positive, got {qps}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+
+        self.qps = qps
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.total_calls = 0
+        self.throttled_calls = 0  # Calls that had to wait for a token
+        self.total_wait_seconds = 0.0
+
+        logger.info(f"Rate limiter initialized: {qps} QPS, burst {burst}")
+
+    def _refill(self, now: float):
+        """Add the tokens accrued since the last refill. Caller holds the lock."""
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.qps)
+        self._last_refill = now
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping until it is available.
+
+        Tokens are reserved up front (the balance may go negative), so concurrent
+        callers queue fairly instead of waking up together.
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            wait = -self._tokens / self.qps if self._tokens < 0 else 0.0
+
+            self.total_calls += 1
+            if wait > 0:
+                self.throttled_calls += 1
+                self.total_wait_seconds += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def current_wait_time(self) -> float:
+        """Seconds a call made now would wait for a token."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                return 0.0
+            return (1 - self._tokens) / self.qps
+
+    def stats(self) -> dict:
+        """Snapshot of the limiter counters."""
+        return {
+            "qps": self.qps,
+            "burst": self.burst,
+            "total_calls": self.total_calls,
+            "throttled_calls": self.throttled_calls,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+            "current_wait_seconds": round(self.current_wait_time(), 3)
+        }
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Deterministic replay of an event journal (see event_journal.py).
+Rebuilds SchedulingLogic state at any offset, checks that replayed actions
+match the recorded ones, and measures per-call planning latency offline.
+
+Usage:
+    python replay.py /var/lib/custom-scheduler/journal.jsonl [--until N] [--top 10]
+"""
+
+import argparse
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from event_journal import read_journal
+from scheduling_logic import SchedulingLogic
+
+logger = logging.getLogger(__name__)
+
+# Calls that replace all state; replay starts a fresh SchedulingLogic for them
+RESET_OPS = frozenset({"initialize", "restore"})
+REPLAYABLE_OPS = RESET_OPS | {"handle_event", "handle_events", "handle_action_results", "resync_pod"}
+
+
+@dataclass
+class ReplayReport:
+    """Outcome of replaying a journal."""
+    logic: Optional[SchedulingLogic] = None  # State after the last replayed call
+    calls: int = 0
+    latencies: Dict[str, List[float]] = field(default_factory=dict)  # op -> seconds per call
+    divergences: List[int] = field(default_factory=list)  # Offsets whose actions differ from the recording
+    slowest: List[Tuple[float, int, str]] = field(default_factory=list)  # (seconds, offset, op), slowest first
+
+
+def replay(records: Iterable[dict], until: Optional[int] = None, verify: bool = True,
+           top: int = 10) -> ReplayReport:
+    """
+    Replay journal records into a SchedulingLogic.
+
+    Args:
+        records: Journal records in order
+        until: Stop after this many calls (offset of the state to rebuild); None replays everything
+        verify: Compare replayed actions against the recorded "actions" records
+        top: Number of slowest calls to keep
+
+    Returns:
+        ReplayReport with the final state, latencies and divergences
+    """
+    report = ReplayReport()
+    timings: List[Tuple[float, int, str]] = []
+    last_actions = None
+
+    for record in records:
+        op = record["op"]
+
+        if op == "actions":
+            if verify and last_actions is not None and last_actions != record["actions"]:
+                report.divergences.append(report.calls - 1)
+            last_actions = None
+            continue
+
+        if op not in REPLAYABLE_OPS:
+            raise ValueError(f"Unknown journal op {op!r} at offset {report.calls}")
+        if until is not None and report.calls >= until:
+            break
+
+        if op in RESET_OPS or report.logic is None:
+            report.logic = SchedulingLogic()
+
+        start = time.perf_counter()
+        result = getattr(report.logic, op)(*record["args"], **record.get("kwargs", {}))
+        elapsed = time.perf_counter() - start
+
+        # Round-trip through JSON so tuples etc. compare like the recorded actions
+        last_actions = json.loads(json.dumps(result["actions"]))
+        report.latencies.setdefault(op, []).append(elapsed)
+        timings.append((elapsed, report.calls, op))
+        report.calls += 1
+
+    report.slowest = sorted(timings, reverse=True)[:top]
+    return report
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = min(len(sorted_values) - 1, int(round(percentile / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def format_report(report: ReplayReport) -> str:
+    """Render latency statistics and divergences as text."""
+    lines = [f"Replayed {report.calls} calls"]
+    for op, values in sorted(report.latencies.items()):
+        ordered = sorted(values)
+        lines.append(f"  {op:<22} n={len(ordered):<7} "
+                     f"mean={sum(ordered) / len(ordered) * 1000:.3f}ms "
+                     f"p50={_percentile(ordered, 50) * 1000:.3f}ms "
+                     f"p99={_percentile(ordered, 99) * 1000:.3f}ms "
+                     f"max={ordered[-1] * 1000:.3f}ms")
+
+    if report.slowest:
+        lines.append("Slowest calls:")
+        for seconds, offset, op in report.slowest:
+            lines.append(f"  offset {offset:<8} {op:<22} {seconds * 1000:.3f}ms")
+
+    if report.divergences:
+        lines.append(f"{len(report.divergences)} calls diverged from the recording, "
+                     f"first at offset {report.divergences[0]}")
+    else:
+        lines.append("Replayed actions match the recording")
+    return "\n".join(lines)
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Replay a scheduler event journal")
+    parser.add_argument("journal", help="Path to the JSONL journal")
+    parser.add_argument("--until", type=int, default=None,
+                        help="Stop after this many calls to inspect the state at that offset")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest calls to list")
+    parser.add_argument("--no-verify", action="store_true", help="Skip comparing actions with the recording")
+    parser.add_argument("--snapshot-out", default=None,
+                        help="Write the final state as a to_snapshot() JSON file")
+    args = parser.parse_args()
+
+    # Keep planning logs out of the timings
+    logging.getLogger("scheduling_logic").setLevel(logging.WARNING)
+
+    report = replay(read_journal(args.journal), until=args.until,
+                    verify=not args.no_verify, top=args.top)
+    print(format_report(report))
+
+    if args.snapshot_out and report.logic is not None:
+        with open(args.snapshot_out, "w") as f:
+            json.dump(report.logic.to_snapshot(), f)
+        print(f"Wrote state at offset {report.calls} to {args.snapshot_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Retry policy with exponential backoff and jitter for transient API errors.
+No Kubernetes dependencies - the caller classifies its own exceptions.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional, Tuple, TypeVar
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: throttling and server-side/transport failures
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, bounded by an attempt count and a time budget.
+
+    The n-th retry waits a random time in [0, min(max_delay, base_delay * 2**n)],
+    or at least the server's Retry-After when one is given. When retries are
+    exhausted the last exception is re-raised so the caller can escalate.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.1,
+                 max_delay: float = 5.0, budget_seconds: float = 15.0,
+                 sleep: Callable[[float], None] = time.sleep,
+                 rng: Callable[[], float] = random.random):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_seconds = budget_seconds
+        self._sleep = sleep
+        self._rng = rng
+
+        # Metrics; call() runs on executor worker threads, so updates take the lock
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.exhausted = 0
+
+    @staticmethod
+    def is_retryable_status(status: Optional[int]) -> bool:
+        """True for throttling/server errors; None means no response (connection error)."""
+        return status is None or status in RETRYABLE_STATUSES
+
+    def backoff(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """Delay before the given retry (1-based), honoring the server's Retry-After."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** retry))
+        delay = self._rng() * ceiling
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def call(self, operation: Callable[[], T],
+             classify: Callable[[Exception], Tuple[bool, Optional[float]]],
+             description: str = "operation") -> T:
+        """
+        Run operation, retrying transient failures.
+
+        Args:
+            operation: Zero-argument callable to run
+            classify: Maps an exception to (retryable, retry_after seconds or None)
+            description: Used in log messages
+
+        Returns:
+            The operation's return value
+        """
+        deadline = time.monotonic() + self.budget_seconds
+        attempt = 1
+
+        while True:
+            try:
+                return operation()
+            except Exception as e:
+                retryable, retry_after = classify(e)
+                if not retryable:
+                    raise
+
+                delay = self.backoff(attempt, retry_after)
+                if attempt >= self.max_attempts or time.monotonic() + delay > deadline:
+                    with self._lock:
+                        self.exhausted += 1
+                    logger.error(f"Giving up on {description} after {attempt} attempts: {e}")
+                    raise
+
+                with self._lock:
+                    self.retries += 1
+                logger.warning(f"Transient failure on {description} (attempt {attempt}/{self.max_attempts}), "
+                               f"retrying in {delay:.3f}s: {e}")
+                self._sleep(delay)
+                attempt += 1
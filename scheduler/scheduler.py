@@ -4,14 +4,28 @@ Kubernetes Adapter for Custom Scheduler.
 Handles all Kubernetes API interactions and delegates scheduling logic to scheduling_logic.py.
 """
 
+import atexit
+import json
 import logging
 import os
-from typing import Optional
+import queue
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from kubernetes import client, config, watch
 from kubernetes.client.rest import ApiException
+from urllib3.exceptions import HTTPError as TransportError
 
+from action_executor import ActionExecutor, ActionResult
+from capacity_model import LabelSlotCapacity, SingleSlotCapacity
+from event_journal import EventJournal
+from rate_limiter import TokenBucketRateLimiter
+from retry_policy import RetryPolicy
 from scheduling_logic import SchedulingLogic
+from state_snapshot import StateSnapshotStore
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,56 +34,303 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class WatchExpiredError(Exception):
+    """The watch resourceVersion is too old (HTTP 410 Gone) and a relist is required."""
+
+
+@dataclass
+class NodeEvent:
+    """A node lifecycle change derived from the node watch."""
+    event_type: str  # "NODE_ADDED" | "NODE_REMOVED" | "NODE_CORDONED"
+    node_name: str
+    slots: int = 1  # Pod slots of an added node
+    
+    def to_dict(self) -> dict:
+        """Convert to the event dict format consumed by SchedulingLogic.handle_events."""
+        return {"event_type": self.event_type, "node_name": self.node_name, "slots": self.slots}
+
+
 class CustomScheduler:
     """
     Kubernetes adapter for custom scheduler.
     Watches pod events, converts to simple dicts, and executes scheduling actions.
     """
     
-    def __init__(self, scheduler_name: str = "custom-scheduler"):
+    def __init__(self, scheduler_name: str = "custom-scheduler",
+                 batch_max_delay: float = 0.5, batch_max_size: int = 500,
+                 list_page_size: int = 500, raw_decode: bool = False,
+                 action_concurrency: int = 8, api_qps: float = 50, api_burst: int = 100,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 snapshot_path: Optional[str] = None, snapshot_interval: float = 30,
+                 journal_path: Optional[str] = None,
+                 capacity_model=None):
         self.scheduler_name = scheduler_name
         self.v1 = client.CoreV1Api()
-        self.logic = SchedulingLogic()
+        
+        # Optional write-ahead journal of every logic input and output, for offline replay
+        self.journal = EventJournal(journal_path) if journal_path else None
+        if self.journal is not None:
+            atexit.register(self.journal.close)
+        self.logic = self._new_logic()
+        # Latest plan version handed out; a re-initialized logic continues from it, so
+        # binds still queued from the previous state stay older than its plans
+        self.plan_version = 0
         self.last_reinit_time = 0  # Track when we last re-initialized
         self.reinit_cooldown = 30  # Minimum seconds between re-inits
         self.reinit_sleep_delay = 3  # Seconds to wait before re-init to let cluster settle
         
-        logger.info(f"Custom scheduler '{scheduler_name}' initialized")
+        # Event coalescing window: watch events are buffered and handed to the
+        # logic layer as one batch after batch_max_delay seconds or batch_max_size events
+        self.batch_max_delay = batch_max_delay
+        self.batch_max_size = batch_max_size
+        self.event_queue: queue.Queue = queue.Queue()
+        self.pod_watch_thread: Optional[threading.Thread] = None
+        
+        # Pods per node: SingleSlotCapacity (one pod per node) unless a model that reads
+        # node labels/annotations is given (see capacity_model.py)
+        self.capacity_model = capacity_model or SingleSlotCapacity()
+        
+        # Node watch: autoscaled, cordoned and removed nodes change capacity incrementally
+        # instead of waiting for a re-init. node_slots is the node list the logic state
+        # was built from (name -> slots, 0 if unschedulable) and seeds each node watch.
+        self.node_watch_thread: Optional[threading.Thread] = None
+        self.node_slots: Dict[str, int] = {}
+        self.node_resource_version: Optional[str] = None
+        
+        # resourceVersion bookkeeping: the version the logic state reflects (from the
+        # last LIST or the last applied watch event), used to resume the watch
+        self.pod_resource_version: Optional[str] = None
+        # Bumped whenever state is (re)listed; watch events and action results
+        # from older generations are dropped
+        self.state_generation = 0
+        self.watch_retry_delay = 1  # Seconds to wait before resuming a disconnected watch
+        
+        # Let the API server filter pods: only ours, and only non-terminal ones.
+        # Pods that reach Succeeded/Failed drop out of the selector, which the
+        # watch reports as DELETED, freeing their node.
+        self.pod_field_selector = (f"spec.schedulerName={scheduler_name},"
+                                   f"status.phase!=Succeeded,status.phase!=Failed")
+        
+        # Pods per LIST page; bounds peak memory during (re)initialization
+        self.list_page_size = list_page_size
+        
+        # Read LIST/WATCH responses as raw JSON and extract only the fields the logic
+        # layer needs, instead of deserializing full V1Pod object graphs
+        self.raw_decode = raw_decode
+        
+        # Binds and preempts run concurrently on a thread pool, ordered per node
+        self.executor = ActionExecutor(self._run_action, max_workers=action_concurrency)
+        
+        # Units admitted/evicted and pods moved across plan versions, from the logic layer's deltas
+        self.plan_churn = {"admitted": 0, "evicted": 0, "moved": 0}
+        
+        # All mutating API calls go through a token bucket to avoid 429s from the API server
+        self.rate_limiter = TokenBucketRateLimiter(qps=api_qps, burst=api_burst)
+        
+        # Transient API errors (429/5xx/connection) are retried with backoff;
+        # only exhausted retries escalate to a re-init
+        self.retry_policy = retry_policy or RetryPolicy()
+        
+        # Logic state is periodically written to a local volume, tagged with its
+        # resourceVersion, so a restart can resume the watch instead of re-listing
+        self.snapshot_store = StateSnapshotStore(snapshot_path) if snapshot_path else None
+        self.snapshot_interval = snapshot_interval
+        self.last_snapshot_time = time.monotonic()
+        
+        self.stats_log_interval = 60  # Seconds between rate limiter stats log lines
+        self.last_stats_log_time = time.monotonic()
+        
+        # `kill -USR1 <pid>` logs the full logic state. The handler only sets a flag;
+        # the main loop dumps between batches, never in the middle of a state change.
+        self.state_dump_requested = False
+        self.idle_wakeup_interval = 1.0  # Seconds between state dump checks while no events arrive
+        
+        logger.info(f"Custom scheduler '{scheduler_name}' initialized "
+                    f"(batch window {batch_max_delay}s / {batch_max_size} events, "
+                    f"{'raw JSON' if raw_decode else 'model'} pod decoding)")
+    
+    def _new_logic(self) -> SchedulingLogic:
+        """Create an empty SchedulingLogic that records to the journal, if one is configured."""
+        return SchedulingLogic(journal=self.journal)
     
     def initialize_cluster_state(self):
         """Initialize the scheduler's view of the cluster state."""
         logger.info("Initializing cluster state...")
+        self.state_generation += 1
+        
+        nodes, cordoned = self._list_nodes()
+        
+        # Stream existing pods for our scheduler into the logic layer page by page.
+        # If the continue token expires mid-list (410), start over with a fresh state.
+        for attempt in range(2):
+            try:
+                result = self.logic.initialize(nodes, self._list_pods(), cordoned, self.plan_version)
+                break
+            except ApiException as e:
+                if e.status != 410 or attempt:
+                    raise
+                logger.warning("Pod list continue token expired (410) - restarting list")
+                self.logic = self._new_logic()
+        
+        logger.info(f"Loaded existing pods (Pending/Running) at resourceVersion {self.pod_resource_version}")
         
-        # Get all schedulable nodes
+        # Execute any actions returned
+        self._apply_logic_result(result)
+    
+    def _list_nodes(self) -> Tuple[Dict[str, int], List[str]]:
+        """
+        Get all nodes with their pod slots (node name -> slots), and the cordoned ones among
+        them. Cordoned nodes are passed on so the logic keeps the pods still running there.
+        Records every node's schedulable slots and the list's resourceVersion for the node watch.
+        """
         nodes = self.v1.list_node()
-        node_names = []
+        self.node_resource_version = nodes.metadata.resource_version
+        
+        self.node_slots = {}
+        all_slots = {}
+        cordoned = []
         for node in nodes.items:
-            if not node.spec.unschedulable:
-                node_names.append(node.metadata.name)
+            name = node.metadata.name
+            slots = self.node_slots[name] = self._node_slot_count(node)
+            if node.spec.unschedulable:
+                # Offers no slots to new pods, but the logic keeps the ones its pods run in
+                slots = self.capacity_model.slots(node.metadata.labels, node.metadata.annotations)
+                cordoned.append(name)
+            all_slots[name] = slots
+        
+        logger.info(f"Found {len(all_slots) - len(cordoned)} schedulable nodes with "
+                    f"{sum(self.node_slots.values())} pod slots, {len(cordoned)} cordoned")
+        return all_slots, cordoned
+    
+    def _node_slot_count(self, node) -> int:
+        """Pod slots a node offers according to the capacity model; 0 if it is unschedulable."""
+        if node.spec.unschedulable:
+            return 0
+        return self.capacity_model.slots(node.metadata.labels, node.metadata.annotations)
+    
+    def _restore_from_snapshot(self) -> bool:
+        """
+        Warm start: restore logic state from the snapshot file instead of listing all pods.
+        The watch then resumes from the snapshot's resourceVersion; if that version has
+        been compacted away, the watch reports 410 and the main loop relists.
+        
+        Returns:
+            True if state was restored, False if a full initialization is needed
+        """
+        if self.snapshot_store is None:
+            return False
+        
+        loaded = self.snapshot_store.load()
+        if loaded is None:
+            return False
+        state, resource_version = loaded
+        
+        try:
+            self.state_generation += 1
+            self.logic = self._new_logic()
+            nodes, cordoned = self._list_nodes()
+            result = self.logic.restore(state, nodes, cordoned)
+        except Exception as e:
+            logger.warning(f"Failed to restore state snapshot, falling back to full LIST: {e}")
+            self.logic = self._new_logic()
+            return False
+        
+        self.pod_resource_version = resource_version
+        logger.info(f"Restored cluster state from snapshot at resourceVersion {resource_version}")
+        
+        self._apply_logic_result(result)
+        return True
+    
+    def _maybe_write_snapshot(self):
+        """
+        Periodically write the logic state to the snapshot file.
+        
+        Only written when no actions are in flight and all their results have been
+        applied, so the snapshot never holds an optimistic bind that was not issued.
+        """
+        if self.snapshot_store is None or self.pod_resource_version is None:
+            return
+        if time.monotonic() - self.last_snapshot_time < self.snapshot_interval:
+            return
+        if self.executor.outstanding or not self.event_queue.empty():
+            return
         
-        logger.info(f"Found {len(node_names)} schedulable nodes")
+        try:
+            self.snapshot_store.save(self.logic.to_snapshot(), self.pod_resource_version)
+        except OSError as e:
+            logger.warning(f"Failed to write state snapshot: {e}")
+        self.last_snapshot_time = time.monotonic()
+    
+    def _list_pods(self) -> Iterator[dict]:
+        """
+        List our pods in pages of list_page_size and yield them as dicts.
+        Only one page of pods is held in memory at a time.
+        Records the resourceVersion of the list for resuming the watch.
+        """
+        continue_token = None
+        page_count = 0
         
-        # Get all existing pods for our scheduler
-        pods = self.v1.list_pod_for_all_namespaces()
-        existing_pods = []
-        for pod in pods.items:
-            if pod.spec.scheduler_name == self.scheduler_name:
+        while True:
+            items, list_version, continue_token = self._list_pod_page(continue_token)
+            page_count += 1
+            
+            # All pages of a chunked list are served from the same snapshot
+            if page_count == 1:
+                self.pod_resource_version = list_version
+            
+            for pod in items:
+                pod_dict, scheduler_name, phase = self._decode_pod(pod)
+                
+                # The field selector already filters on the server; keep the checks as a safeguard
+                if scheduler_name != self.scheduler_name:
+                    continue
+                
                 # Filter out terminal phases
-                if pod.status.phase in ['Succeeded', 'Failed']:
+                if phase in ['Succeeded', 'Failed']:
                     continue
                 
-                pod_dict = self._pod_to_dict(pod)
-                existing_pods.append(pod_dict)
+                yield pod_dict
+            
+            if not continue_token:
+                break
+        
+        logger.debug(f"Listed pods in {page_count} pages")
+    
+    def _list_pod_page(self, continue_token: Optional[str]) -> Tuple[list, Optional[str], Optional[str]]:
+        """
+        Fetch one page of our pods.
         
-        logger.info(f"Found {len(existing_pods)} existing pods (Pending/Running)")
+        Returns:
+            (items, resourceVersion, continue token) - items are V1Pod objects,
+            or raw JSON dicts when raw_decode is enabled
+        """
+        kwargs = {
+            "field_selector": self.pod_field_selector,
+            "limit": self.list_page_size,
+            "_continue": continue_token
+        }
         
-        # Initialize logic layer
-        result = self.logic.initialize(node_names, existing_pods)
+        if self.raw_decode:
+            response = self.v1.list_pod_for_all_namespaces(_preload_content=False, **kwargs)
+            try:
+                body = json.loads(response.data)
+            finally:
+                # Unpreloaded responses keep their pooled connection until released
+                response.release_conn()
+            metadata = body.get("metadata") or {}
+            return body.get("items") or [], metadata.get("resourceVersion"), metadata.get("continue")
         
-        # Execute any actions returned
-        self._execute_actions(result["actions"])
+        page = self.v1.list_pod_for_all_namespaces(**kwargs)
+        return page.items, page.metadata.resource_version, page.metadata._continue
+    
+    def _watch_pods_raw(self, **kwargs):
+        """
+        List/watch pods without a documented return type, so the watch
+        yields raw JSON objects instead of deserializing V1Pod models.
+        """
+        return self.v1.list_pod_for_all_namespaces(**kwargs)
     
-    def _safe_reinitialize(self, reason: str) -> bool:
+    def _safe_reinitialize(self, reason: str, force: bool = False) -> bool:
         """
         Safely re-initialize scheduler state after an error.
         Creates a fresh SchedulingLogic instance and re-reads cluster state.
@@ -77,15 +338,15 @@ class CustomScheduler:
         
         Args:
             reason: Description of why re-init was triggered
+            force: Ignore the cooldown (used when the watch cannot resume without a relist)
         
         Returns:
             True if re-init succeeded, False if skipped due to cooldown
         """
-        import time
         current_time = time.time()
         
         # Check cooldown to prevent rapid re-init loops
-        if current_time - self.last_reinit_time < self.reinit_cooldown:
+        if not force and current_time - self.last_reinit_time < self.reinit_cooldown:
             logger.warning(f"Skipping re-init (cooldown active): {reason}")
             return False
         
@@ -94,20 +355,38 @@ class CustomScheduler:
             self.last_reinit_time = current_time
             
             # Wait for in-flight operations to complete and cluster state to settle
+            self.executor.wait_idle(timeout=self.reinit_cooldown)
             time.sleep(self.reinit_sleep_delay)
             
             # Create fresh SchedulingLogic instance (clears all state)
-            self.logic = SchedulingLogic()
+            self.logic = self._new_logic()
             
             # Re-read cluster state
             self.initialize_cluster_state()
             
+            # Restart the watches from the versions of the fresh LISTs
+            self._start_pod_watch()
+            self._start_node_watch()
+            
             logger.debug("Successfully re-initialized scheduler state")
             return True
         except Exception as e:
             logger.error(f"Failed to re-initialize scheduler state: {e}", exc_info=True)
             return False
     
+    def _decode_pod(self, pod) -> Tuple[dict, Optional[str], Optional[str]]:
+        """
+        Convert a V1Pod or a raw JSON pod to a simple dict.
+        
+        Returns:
+            (pod dict, spec.schedulerName, status.phase)
+        """
+        if isinstance(pod, dict):
+            return (self._raw_pod_to_dict(pod),
+                    (pod.get("spec") or {}).get("schedulerName"),
+                    (pod.get("status") or {}).get("phase"))
+        return self._pod_to_dict(pod), pod.spec.scheduler_name, pod.status.phase
+    
     def _pod_to_dict(self, pod) -> dict:
         """Convert a Kubernetes pod object to a simple dict."""
         return {
@@ -119,11 +398,38 @@ class CustomScheduler:
             "node_name": pod.spec.node_name
         }
     
+    def _raw_pod_to_dict(self, pod: dict) -> dict:
+        """Convert a raw JSON pod (as returned by the API server) to a simple dict."""
+        metadata = pod.get("metadata") or {}
+        spec = pod.get("spec") or {}
+        annotations = metadata.get("annotations") or {}
+        return {
+            "uid": metadata.get("uid"),
+            "name": metadata.get("name"),
+            "namespace": metadata.get("namespace"),
+            "priority": self._parse_priority(annotations, spec.get("priority")),
+            "gang_name": annotations.get("pod-group"),
+            "node_name": spec.get("nodeName")
+        }
+    
+    def _resource_version(self, obj) -> Optional[str]:
+        """
+        Get metadata.resourceVersion of a watched object: a model (V1Pod, V1Node) or raw JSON,
+        which is also what BOOKMARK events carry.
+        """
+        if isinstance(obj, dict):
+            return (obj.get("metadata") or {}).get("resourceVersion")
+        return obj.metadata.resource_version
+    
     def _get_pod_priority(self, pod) -> int:
         """Extract priority from pod annotations or spec."""
+        return self._parse_priority(pod.metadata.annotations, pod.spec.priority)
+    
+    def _parse_priority(self, annotations: Optional[dict], spec_priority: Optional[int]) -> int:
+        """Resolve priority from the priority annotation, falling back to spec.priority."""
         # Check for priority annotation first
-        if pod.metadata.annotations:
-            priority_str = pod.metadata.annotations.get("priority")
+        if annotations:
+            priority_str = annotations.get("priority")
             if priority_str:
                 try:
                     return int(priority_str)
@@ -131,8 +437,8 @@ class CustomScheduler:
                     pass
         
         # Fall back to priorityClassName or default
-        if pod.spec.priority is not None:
-            return pod.spec.priority
+        if spec_priority is not None:
+            return spec_priority
         
         return 0  # Default priority
     
@@ -142,30 +448,123 @@ class CustomScheduler:
             return pod.metadata.annotations.get("pod-group")
         return None
     
+    def _apply_logic_result(self, result: dict):
+        """
+        Act on a logic layer result: cancel queued binds made stale by the new plan
+        version, count plan churn, and execute the actions.
+        
+        A pod whose bind was cancelled was never bound, so the plan's preempt of it is
+        dropped and reported back to the logic as cancelled, which plans the pod again.
+        """
+        self.plan_version = max(self.plan_version, result["plan_version"])
+        actions = result["actions"]
+        delta = result["delta"]
+        cancelled = set()
+        if delta["evicted"] or delta["moved"]:
+            # Binds of evicted units and of pods now known to be elsewhere would only
+            # be preempted or conflict once they run
+            stale_pods = [uid for unit in delta["evicted"] for uid in unit["pod_uids"]]
+            stale_pods.extend(move["pod_uid"] for move in delta["moved"])
+            cancelled = self.executor.cancel_stale(stale_pods, result["plan_version"])
+        
+        self.plan_churn["admitted"] += len(delta["admitted"])
+        self.plan_churn["evicted"] += len(delta["evicted"])
+        self.plan_churn["moved"] += len(delta["moved"])
+        
+        dropped = [action for action in actions
+                   if action["action"] == "preempt" and action["pod_uid"] in cancelled]
+        if dropped:
+            actions = [action for action in actions
+                       if action["action"] != "preempt" or action["pod_uid"] not in cancelled]
+        
+        self._execute_actions(actions)
+        
+        if dropped:
+            self._apply_logic_result(self.logic.handle_action_results(
+                [{"action": action, "success": False, "cancelled": True} for action in dropped]))
+    
     def _execute_actions(self, actions: list):
-        """Execute scheduling actions returned by logic layer."""
+        """
+        Hand scheduling actions returned by logic layer to the concurrent executor.
+        Results come back to the main loop through the event queue.
+        """
         if not actions:
             return
-                
-        for action in actions:
-            action_type = action["action"]
+        
+        generation = self.state_generation
+        self.executor.submit(
+            actions,
+            on_result=lambda result: self.event_queue.put((generation, None, result))
+        )
+    
+    def _run_action(self, action: dict) -> ActionResult:
+        """Execute a single action. Runs on an executor worker thread."""
+        action_type = action["action"]
+        
+        if action_type == "bind":
+            return self._execute_bind(action)
+        elif action_type == "preempt":
+            return self._execute_preempt(action)
+        
+        logger.warning(f"Unknown action type: {action_type}")
+        return ActionResult(action=action, success=False, error=f"unknown action type {action_type}")
+    
+    def _handle_action_results(self, results: List[ActionResult]):
+        """
+        Report executed actions to the logic layer, execute any follow-up actions,
+        and re-initialize if a failure left our state in doubt.
+        """
+        result = self.logic.handle_action_results([r.to_dict() for r in results])
+        self._apply_logic_result(result)
+        
+        # A missing pod (404) or a conflict with a known pod location is resolved by the
+        # logic layer; other failures need a re-init
+        failures = [r for r in results
+                    if not r.success and r.status != 404 and r.observed_pod is None]
+        if failures:
+            failed = failures[0].action
+            self._safe_reinitialize(f"{failed['action']} failure for "
+                                    f"{failed['pod_namespace']}/{failed['pod_name']}: {failures[0].error}")
+    
+    def _mutating_call(self, description: str, func, **kwargs):
+        """Issue a rate-limited mutating API call, retrying transient failures with backoff."""
+        def attempt():
+            self.rate_limiter.acquire()
+            return func(**kwargs)
+        
+        return self.retry_policy.call(attempt, self._classify_api_error, description)
+    
+    def _classify_api_error(self, error: Exception) -> Tuple[bool, Optional[float]]:
+        """
+        Decide whether an API error is transient.
+        
+        Returns:
+            (retryable, Retry-After seconds or None)
+        """
+        if isinstance(error, ApiException):
+            if not RetryPolicy.is_retryable_status(error.status):
+                return False, None
             
-            if action_type == "bind":
-                self._execute_bind(
-                    action["pod_name"],
-                    action["pod_namespace"],
-                    action["node_name"]
-                )
-            elif action_type == "preempt":
-                self._execute_preempt(
-                    action["pod_name"],
-                    action["pod_namespace"]
-                )
-            else:
-                logger.warning(f"Unknown action type: {action_type}")
+            retry_after = None
+            if error.headers and error.headers.get("Retry-After"):
+                try:
+                    retry_after = float(error.headers["Retry-After"])
+                except ValueError:
+                    pass  # HTTP-date form - fall back to our own backoff
+            return True, retry_after
+        
+        # No response at all (connection reset, timeout) is transient too
+        if isinstance(error, (TransportError, ConnectionError)):
+            return True, None
+        
+        return False, None
     
-    def _execute_bind(self, pod_name: str, pod_namespace: str, node_name: str) -> bool:
+    def _execute_bind(self, action: dict) -> ActionResult:
         """Bind a pod to a node using the Kubernetes binding API."""
+        pod_name = action["pod_name"]
+        pod_namespace = action["pod_namespace"]
+        node_name = action["node_name"]
+        
         try:
             logger.info(f"Binding pod {pod_namespace}/{pod_name} to node {node_name}")
             
@@ -175,36 +574,22 @@ class CustomScheduler:
                 metadata=client.V1ObjectMeta(name=pod_name)
             )
             
-            self.v1.create_namespaced_binding(
+            self._mutating_call(
+                f"bind {pod_namespace}/{pod_name}",
+                self.v1.create_namespaced_binding,
                 namespace=pod_namespace,
                 body=binding,
                 _preload_content=False
             )
             
             logger.debug(f"Successfully bound pod {pod_namespace}/{pod_name} to node {node_name}")
-            return True
+            return ActionResult(action=action, success=True)
             
         except ApiException as e:
             if e.status == 404:
-                # Pod not found - it was deleted. Notify logic layer to clean up state.
+                # Pod not found - it was deleted. The logic layer cleans up its state from the result.
                 logger.warning(f"Pod {pod_namespace}/{pod_name} not found (404) during bind - notifying logic of deletion")
-                
-                # We don't have full pod info, but we have enough for a DELETE event
-                delete_event = {
-                    "event_type": "DELETED",
-                    "pod": {
-                        "uid": "unknown",  # We don't have UID, but logic will search by name if needed
-                        "name": pod_name,
-                        "namespace": pod_namespace,
-                        "priority": 0,
-                        "gang_name": None
-                    }
-                }
-                
-                # Notify logic layer - don't execute resulting actions
-                self.logic.handle_event(delete_event)
-                
-                return False  # Bind failed, but we handled it gracefully
+                return ActionResult(action=action, success=False, status=404, error="pod not found")
             elif e.status == 409:
                 # Conflict - pod may already be bound. Check if it's bound to our target node.
                 
@@ -214,32 +599,38 @@ class CustomScheduler:
                     # Check if pod is already bound to the target node
                     if pod.spec.node_name == node_name:
                         logger.debug(f"Pod {pod_namespace}/{pod_name} already bound to {node_name} - treating as success (idempotent)")
-                        return True
+                        return ActionResult(action=action, success=True)
                     else:
+                        # Hand the observed pod to the logic layer for a targeted resync
                         logger.error(f"Pod {pod_namespace}/{pod_name} bound to different node: {pod.spec.node_name} (expected {node_name})")
-                        self._safe_reinitialize(f"bind conflict - pod on wrong node")
-                        return False
+                        return ActionResult(action=action, success=False, status=409,
+                                            observed_pod=self._pod_to_dict(pod),
+                                            error=f"bind conflict - pod on wrong node {pod.spec.node_name}")
                 except ApiException as read_error:
                     logger.error(f"Failed to read pod after 409 conflict: {read_error}")
-                    self._safe_reinitialize(f"bind conflict and failed to verify")
-                    return False
+                    return ActionResult(action=action, success=False, status=409,
+                                        error="bind conflict and failed to verify")
             else:
                 logger.error(f"Failed to bind pod {pod_namespace}/{pod_name} to node {node_name}: status:{e.status} {e}")
-                self._safe_reinitialize(f"bind failure for {pod_namespace}/{pod_name}")
-                return False
+                return ActionResult(action=action, success=False, status=e.status, error=str(e.reason))
     
-    def _execute_preempt(self, pod_name: str, pod_namespace: str) -> bool:
+    def _execute_preempt(self, action: dict) -> ActionResult:
         """
         Preempt a pod by deleting it.
         
         Note: spec.nodeName is immutable, so we must delete the pod.
         If managed by a controller, it will be recreated and become Pending.
         """
+        pod_name = action["pod_name"]
+        pod_namespace = action["pod_namespace"]
+        
         try:
             logger.info(f"Preempting pod {pod_namespace}/{pod_name} - deleting for recreation")
             
             # Delete the pod
-            self.v1.delete_namespaced_pod(
+            self._mutating_call(
+                f"preempt {pod_namespace}/{pod_name}",
+                self.v1.delete_namespaced_pod,
                 name=pod_name,
                 namespace=pod_namespace,
                 body=client.V1DeleteOptions(
@@ -249,71 +640,303 @@ class CustomScheduler:
             
             logger.debug(f"Pod {pod_namespace}/{pod_name} deleted. "
                          f"Controller will recreate it as Pending if applicable")
-            return True
+            return ActionResult(action=action, success=True)
             
         except ApiException as e:
             if e.status == 404:
                 # Pod already deleted - this is actually success!
                 logger.info(f"Pod {pod_namespace}/{pod_name} already deleted (404) - goal achieved")
-                return True
+                return ActionResult(action=action, success=True)
             else:
                 # This is really bad since we already remove the state in scheduling_logic.py. Reconsider this logic flow.
                 logger.error(f"Failed to preempt pod {pod_namespace}/{pod_name}: status:{e.status} {e}")
-                self._safe_reinitialize(f"preempt failure for {pod_namespace}/{pod_name}")
-                return False
+                return ActionResult(action=action, success=False, status=e.status, error=str(e.reason))
     
-    def run(self):
-        """Main scheduler loop."""
-        logger.info("Starting scheduler main loop...")
-        self.initialize_cluster_state()
-        
-        w = watch.Watch()
+    def _watch_pods(self, generation: int, resource_version: Optional[str]):
+        """
+        Stream pod watch events into the event queue, starting at resource_version.
+        Runs in a background thread. Disconnects and stream timeouts resume from the
+        last seen resourceVersion; only HTTP 410 Gone asks the main loop for a relist.
+        """
+        watch_func = self._watch_pods_raw if self.raw_decode else self.v1.list_pod_for_all_namespaces
         
-        try:
-            for event in w.stream(self.v1.list_pod_for_all_namespaces):
-                event_type = event['type']
-                pod = event['object']
+        while generation == self.state_generation:
+            w = watch.Watch()
+            try:
+                for event in w.stream(watch_func,
+                                      field_selector=self.pod_field_selector,
+                                      resource_version=resource_version,
+                                      allow_watch_bookmarks=True):
+                    # State was re-listed meanwhile - a newer watch has taken over
+                    if generation != self.state_generation:
+                        w.stop()
+                        return
+                    
+                    event_version = self._resource_version(event['object'])
+                    if event_version:
+                        resource_version = event_version
+                        # Raw events bypass Watch.unmarshal_event, which is what moves the point
+                        # the stream reconnects from internally when the server closes it
+                        w.resource_version = event_version
+                    
+                    # Bookmarks are queued too: they only advance the resourceVersion the
+                    # logic state reflects, so snapshots of a quiet cluster stay resumable
+                    self.event_queue.put((generation, resource_version, event))
                 
-                # Only process pods that use our scheduler
-                if pod.spec.scheduler_name != self.scheduler_name:
-                    continue
-
-                # only handle ADDED/DELETED events
-                if event_type not in ["ADDED", "DELETED"]:
+                logger.debug(f"Pod watch stream ended, resuming from resourceVersion {resource_version}")
+            except ApiException as e:
+                if e.status == 410:
+                    logger.warning(f"Pod watch resourceVersion {resource_version} expired (410 Gone)")
+                    self.event_queue.put((generation, resource_version,
+                                          WatchExpiredError(f"resourceVersion {resource_version} expired")))
+                    return
+                logger.warning(f"Pod watch failed (status:{e.status}), resuming from "
+                               f"resourceVersion {resource_version}: {e}")
+                time.sleep(self.watch_retry_delay)
+            except Exception as e:
+                logger.warning(f"Pod watch disconnected, resuming from resourceVersion {resource_version}: {e}")
+                time.sleep(self.watch_retry_delay)
+    
+    def _start_pod_watch(self):
+        """
+        Start a background pod watch from the current resourceVersion.
+        Any previous watch belongs to an older generation and stops on its next event.
+        """
+        self.pod_watch_thread = threading.Thread(
+            target=self._watch_pods,
+            args=(self.state_generation, self.pod_resource_version),
+            name=f"pod-watch-{self.state_generation}",
+            daemon=True
+        )
+        self.pod_watch_thread.start()
+    
+    def _watch_nodes(self, generation: int, resource_version: Optional[str], known: Dict[str, int]):
+        """
+        Stream node changes into the event queue as NodeEvents. Runs in a background thread.
+        
+        known (node name -> slots, 0 if unschedulable) is the node list the logic state
+        was built from; only transitions against it are reported: a new or uncordoned
+        node, or one whose slot count changed, is NODE_ADDED, a node turning
+        unschedulable NODE_CORDONED, a deleted node NODE_REMOVED. If the watch expires
+        (410), nodes are re-listed and the differences reported, so no re-init is needed.
+        """
+        def report(event_type: str, name: str, slots: int = 1):
+            logger.info(f"Node event: {event_type} for {name} ({slots} slots)")
+            self.event_queue.put((generation, None, NodeEvent(event_type, name, slots)))
+        
+        def observe(name: str, slots: Optional[int]):
+            """Report the transition to a node's new slot count (None: deleted)."""
+            previous = known.get(name)
+            if slots is None:
+                known.pop(name, None)
+                if previous is not None:
+                    report("NODE_REMOVED", name)
+                return
+            known[name] = slots
+            if slots and slots != previous:
+                report("NODE_ADDED", name, slots)
+            elif not slots and previous:
+                report("NODE_CORDONED", name)
+        
+        while generation == self.state_generation:
+            w = watch.Watch()
+            try:
+                for event in w.stream(self.v1.list_node, resource_version=resource_version,
+                                      allow_watch_bookmarks=True):
+                    if generation != self.state_generation:
+                        w.stop()
+                        return
+                    
+                    resource_version = self._resource_version(event['object']) or resource_version
+                    if event['type'] == 'BOOKMARK':
+                        continue
+                    
+                    node = event['object']
+                    deleted = event['type'] == 'DELETED'
+                    observe(node.metadata.name, None if deleted else self._node_slot_count(node))
+            except ApiException as e:
+                if e.status == 410:
+                    logger.warning("Node watch expired (410 Gone) - re-listing nodes")
+                    try:
+                        nodes = self.v1.list_node()
+                    except Exception as list_error:
+                        logger.warning(f"Node re-list failed: {list_error}")
+                        time.sleep(self.watch_retry_delay)
+                        continue
+                    current = {node.metadata.name: self._node_slot_count(node) for node in nodes.items}
+                    for name in list(known):
+                        if name not in current:
+                            observe(name, None)
+                    for name, slots in current.items():
+                        observe(name, slots)
+                    resource_version = nodes.metadata.resource_version
                     continue
+                logger.warning(f"Node watch failed (status:{e.status}), resuming: {e}")
+                time.sleep(self.watch_retry_delay)
+            except Exception as e:
+                logger.warning(f"Node watch disconnected, resuming: {e}")
+                time.sleep(self.watch_retry_delay)
+    
+    def _start_node_watch(self):
+        """Start a background node watch from the node list the current state was built from."""
+        self.node_watch_thread = threading.Thread(
+            target=self._watch_nodes,
+            args=(self.state_generation, self.node_resource_version, dict(self.node_slots)),
+            name=f"node-watch-{self.state_generation}",
+            daemon=True
+        )
+        self.node_watch_thread.start()
+    
+    def _next_batch(self) -> list:
+        """
+        Wait for the next watch event, then keep collecting events until the
+        coalescing window (batch_max_delay) expires or batch_max_size is reached.
+        While idle, wakes up periodically to serve state dump requests.
+        """
+        while True:
+            try:
+                batch = [self.event_queue.get(timeout=self.idle_wakeup_interval)]
+                break
+            except queue.Empty:
+                self._maybe_dump_state()
+        deadline = time.monotonic() + self.batch_max_delay
+        
+        while len(batch) < self.batch_max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.event_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _process_batch(self, batch: list):
+        """
+        Convert a batch of watch events to dicts and hand them to the logic layer at once.
+        Action results in the batch are reported to the logic layer first.
+        """
+        event_dicts: List[dict] = []
+        action_results: List[ActionResult] = []
+        
+        for generation, resource_version, event in batch:
+            # Drop events and results from before the latest relist
+            if generation != self.state_generation:
+                continue
+            
+            # The watch cannot resume - a relist is required
+            if isinstance(event, WatchExpiredError):
+                raise event
+            
+            if isinstance(event, ActionResult):
+                action_results.append(event)
+                continue
+            
+            # Node changes are applied in order with the pod events around them
+            if isinstance(event, NodeEvent):
+                event_dicts.append(event.to_dict())
+                continue
+            
+            self.pod_resource_version = resource_version
+            event_type = event['type']
+            if event_type == 'BOOKMARK':
+                continue
+            
+            pod_dict, scheduler_name, phase = self._decode_pod(event['object'])
+            
+            # Only process pods that use our scheduler
+            if scheduler_name != self.scheduler_name:
+                continue
 
-                # an advanced scheduler would buffer events and process them in batches but 
-                # that would greatly increase complexity by combining sync and async processing
-                # and debugging would be an order of magnitude more difficult
-
-                # as a single hack, assume no one adds a single pod at a time so we can sleep for 10 
-                # second and re-read the state of the cluster
-                if event_type == "ADDED":
-                    self._safe_reinitialize(f"New pod added and re-read the state of the cluster")
-                
-                logger.info(f"Event: {event_type} for pod {pod.metadata.namespace}/{pod.metadata.name}, "
-                           f"node={pod.spec.node_name} phase={pod.status.phase}")
-                
-                # Convert to dict and send to logic layer
-                event_dict = {
-                    "event_type": event_type,
-                    "pod": self._pod_to_dict(pod)
-                }
-                
-                result = self.logic.handle_event(event_dict)
-                
-                # Execute actions
-                self._execute_actions(result["actions"])
-                
+            # only handle ADDED/DELETED events
+            if event_type not in ["ADDED", "DELETED"]:
+                continue
+            
+            logger.info(f"Event: {event_type} for pod {pod_dict['namespace']}/{pod_dict['name']}, "
+                       f"node={pod_dict['node_name']} phase={phase}")
+            
+            event_dicts.append({
+                "event_type": event_type,
+                "pod": pod_dict
+            })
         
-        except Exception as e:
-            logger.error(f"Error in scheduler main loop: {e}", exc_info=True)
-            if self._safe_reinitialize(f"main loop exception: {e}"):
-                logger.info("Recovered from error, continuing...")
-                # Continue the loop after successful re-init
-            else:
-                logger.error("Failed to recover, shutting down")
-                raise
+        if action_results:
+            generation = self.state_generation
+            self._handle_action_results(action_results)
+            
+            # State was re-listed - the events of this batch are already reflected in it
+            if generation != self.state_generation:
+                return
+        
+        if not event_dicts:
+            return
+        
+        logger.debug(f"Handing batch of {len(event_dicts)} events to logic layer")
+        result = self.logic.handle_events(event_dicts)
+        
+        # Execute actions
+        self._apply_logic_result(result)
+    
+    def _request_state_dump(self, signum, frame):
+        """SIGUSR1 handler: ask the main loop to log the logic state."""
+        self.state_dump_requested = True
+    
+    def _maybe_dump_state(self):
+        """Log the full logic state if a dump was requested."""
+        if not self.state_dump_requested:
+            return
+        self.state_dump_requested = False
+        logger.info(f"State dump requested\n{self.logic.dump_state()}")
+    
+    def _log_stats(self):
+        """Periodically log rate limiter, retry and replan counters."""
+        now = time.monotonic()
+        if now - self.last_stats_log_time < self.stats_log_interval:
+            return
+        self.last_stats_log_time = now
+        
+        stats = self.rate_limiter.stats()
+        logger.info(f"API rate limiter: {stats['throttled_calls']}/{stats['total_calls']} calls throttled, "
+                    f"{stats['total_wait_seconds']}s total wait, current wait {stats['current_wait_seconds']}s "
+                    f"({stats['qps']} QPS, burst {stats['burst']}); "
+                    f"{self.retry_policy.retries} retries, {self.retry_policy.exhausted} exhausted; "
+                    f"plan version {self.logic.plan_version} ({self.logic.plans_computed} plans computed, "
+                    f"{self.logic.skipped_replans} skipped); churn {self.plan_churn['admitted']} admitted, "
+                    f"{self.plan_churn['evicted']} evicted, {self.plan_churn['moved']} moved; "
+                    f"{self.executor.cancelled_stale} stale binds cancelled")
+    
+    def run(self):
+        """Main scheduler loop."""
+        logger.info("Starting scheduler main loop...")
+        signal.signal(signal.SIGUSR1, self._request_state_dump)
+        if not self._restore_from_snapshot():
+            self.initialize_cluster_state()
+        self._start_pod_watch()
+        self._start_node_watch()
+        
+        while True:
+            # Bursts of events (e.g. a Deployment scale-up or a gang arriving pod by pod)
+            # are coalesced into one batch so the logic layer plans once per burst
+            batch = self._next_batch()
+            
+            try:
+                self._process_batch(batch)
+                self._maybe_write_snapshot()
+                self._maybe_dump_state()
+                self._log_stats()
+            except WatchExpiredError as e:
+                # Only an expired resourceVersion requires a full relist
+                if not self._safe_reinitialize(f"watch expired: {e}", force=True):
+                    logger.error("Failed to relist after watch expiry, shutting down")
+                    raise
+            except Exception as e:
+                logger.error(f"Error in scheduler main loop: {e}", exc_info=True)
+                if self._safe_reinitialize(f"main loop exception: {e}"):
+                    logger.info("Recovered from error, continuing...")
+                else:
+                    logger.error("Failed to recover, shutting down")
+                    raise
 
 
 def main():
@@ -327,11 +950,42 @@ def main():
             config.load_kube_config()
             logger.info("Loaded local kube config")
         
-        # Get scheduler name from environment
+        # Get scheduler name and event coalescing window from environment
         scheduler_name = os.getenv("SCHEDULER_NAME", "custom-scheduler")
+        batch_max_delay = float(os.getenv("EVENT_BATCH_MAX_DELAY", "0.5"))
+        batch_max_size = int(os.getenv("EVENT_BATCH_MAX_SIZE", "500"))
+        list_page_size = int(os.getenv("LIST_PAGE_SIZE", "500"))
+        raw_decode = os.getenv("POD_DECODE_MODE", "model") == "raw"
+        action_concurrency = int(os.getenv("ACTION_CONCURRENCY", "8"))
+        api_qps = float(os.getenv("SCHEDULER_API_QPS", "50"))
+        api_burst = int(os.getenv("SCHEDULER_API_BURST", "100"))
+        retry_policy = RetryPolicy(
+            max_attempts=int(os.getenv("API_RETRY_MAX_ATTEMPTS", "5")),
+            budget_seconds=float(os.getenv("API_RETRY_BUDGET_SECONDS", "15"))
+        )
+        snapshot_path = os.getenv("SNAPSHOT_PATH") or None
+        snapshot_interval = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "30"))
+        journal_path = os.getenv("EVENT_JOURNAL_PATH") or None
+        # Node label/annotation with the number of pods a node runs; unset = one pod per node
+        node_slots_key = os.getenv("NODE_SLOTS_KEY") or None
+        capacity_model = LabelSlotCapacity(node_slots_key) if node_slots_key else SingleSlotCapacity()
         logger.info(f"Starting scheduler with name: {scheduler_name}")
         
-        scheduler = CustomScheduler(scheduler_name=scheduler_name)
+        scheduler = CustomScheduler(
+            scheduler_name=scheduler_name,
+            batch_max_delay=batch_max_delay,
+            batch_max_size=batch_max_size,
+            list_page_size=list_page_size,
+            raw_decode=raw_decode,
+            action_concurrency=action_concurrency,
+            api_qps=api_qps,
+            api_burst=api_burst,
+            retry_policy=retry_policy,
+            snapshot_path=snapshot_path,
+            snapshot_interval=snapshot_interval,
+            journal_path=journal_path,
+            capacity_model=capacity_model
+        )
         scheduler.run()
     
     except KeyboardInterrupt:
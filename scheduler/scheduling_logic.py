@@ -4,9 +4,16 @@ Pure Python scheduling logic with no Kubernetes dependencies.
 Implements priority-based scheduling, preemption, and gang-scheduling.
 """
 
+import functools
+import heapq
+import inspect
+import itertools
 import logging
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
+import sys
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,28 +21,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bumped whenever the to_snapshot() format changes; older snapshots are rejected
+SNAPSHOT_FORMAT_VERSION = 3
 
-@dataclass
+# Node lifecycle events accepted by handle_event(s): {"event_type": ..., "node_name": str}
+NODE_EVENT_TYPES = frozenset({"NODE_ADDED", "NODE_REMOVED", "NODE_CORDONED"})
+
+# Separates node name and slot index in slot keys ("node-1#0"). Kubernetes node
+# names cannot contain it.
+SLOT_SEPARATOR = "#"
+
+
+def _slot_keys(node: str, slots: int) -> List[str]:
+    """Slot keys of a node: the node name itself for a single-slot node, "<node>#<i>" otherwise."""
+    if slots == 1:
+        return [node]
+    return [f"{node}{SLOT_SEPARATOR}{i}" for i in range(slots)]
+
+
+def _node_of(slot: str) -> str:
+    """Node name of a slot key."""
+    return slot.partition(SLOT_SEPARATOR)[0]
+
+
+def _intern_optional(value: Optional[str]) -> Optional[str]:
+    """sys.intern that passes None through."""
+    return sys.intern(value) if value is not None else None
+
+
+def _empty_delta() -> dict:
+    """Delta of a call that did not change the plan."""
+    return {"admitted": [], "evicted": [], "moved": []}
+
+
+def _journaled(method):
+    """
+    Record a public entry point's input before it runs and its actions after, when a journal is set.
+    The call is normalized against the method's signature, so arguments passed by keyword are
+    recorded positionally (keyword-only ones under "kwargs") and replay the same way.
+    One-shot iterators (e.g. a streamed pod list) are materialized so they can be recorded.
+    """
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.journal is None:
+            return method(self, *args, **kwargs)
+        
+        bound = signature.bind(self, *args, **kwargs)
+        args = tuple(list(arg) if isinstance(arg, Iterator) else arg for arg in bound.args[1:])
+        kwargs = {name: list(arg) if isinstance(arg, Iterator) else arg for name, arg in bound.kwargs.items()}
+        record = {"op": method.__name__, "ts": time.time(), "args": args}
+        if kwargs:
+            record["kwargs"] = kwargs
+        self.journal.append(record)
+        result = method(self, *args, **kwargs)
+        self.journal.append({"op": "actions", "actions": result["actions"]})
+        return result
+    
+    return wrapper
+
+
+@dataclass(slots=True)
 class PodInfo:
-    """Information about a pod for scheduling decisions."""
+    """
+    Information about a pod for scheduling decisions.
+    Slotted (no per-instance __dict__) since one exists for every tracked pod.
+    """
     uid: str
     name: str
     namespace: str
     priority: int
     gang_name: Optional[str]
     waiting_on_deletion: bool = False
+    # Arrival order among tracked pods, set when the pod is indexed; breaks queue ties
+    seq: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class SchedulingUnit:
     """
     Represents either a single pod or a gang of pods to be scheduled.
     Units are sorted by effective_priority for scheduling decisions.
+    Units are persistent (created when a pod is indexed, reused across plans) and slotted.
     """
     pods: List[PodInfo]  # List of pods (single item for regular pod, multiple for gang)
     is_gang: bool
     effective_priority: int  # For gangs, this is the minimum priority
     gang_name: Optional[str] = None
+    # Position key in the scheduling queue (None while the unit is not queued)
+    queue_key: Optional[Tuple[int, int, int]] = field(default=None, compare=False, repr=False)
     
     def __lt__(self, other):
         """Compare by priority (higher priority first), then by size (smaller first)."""
@@ -51,6 +126,95 @@ class SchedulingUnit:
         return len(self.pods)
 
 
+class _CapacityTree:
+    """
+    Segment tree over the queue buckets, in queue order.
+    
+    Each tree node holds the nodes needed by all units of its range of buckets and
+    the smallest unit size in that range, so a plan can admit whole ranges that fit
+    and skip ranges where nothing fits in O(log B) each, instead of visiting every
+    bucket. Leaves beyond the last bucket are empty (total 0, no size).
+    """
+    
+    _NO_SIZE = float("inf")  # Smallest size of an empty range: nothing to admit
+    
+    def __init__(self):
+        self.rebuild([])
+    
+    def rebuild(self, leaves: List[Tuple[int, int]]):
+        """Rebuild from (total nodes, unit size) per bucket. O(B)."""
+        self._leaves = 1
+        while self._leaves < len(leaves):
+            self._leaves *= 2
+        self._total = [0] * (2 * self._leaves)
+        self._min_size = [self._NO_SIZE] * (2 * self._leaves)
+        for position, (total, size) in enumerate(leaves):
+            self._total[self._leaves + position] = total
+            self._min_size[self._leaves + position] = size
+        for node in range(self._leaves - 1, 0, -1):
+            self._pull(node)
+    
+    def update(self, position: int, total: int, size: int):
+        """Set the total of one bucket. O(log B)."""
+        node = self._leaves + position
+        self._total[node] = total
+        self._min_size[node] = size
+        node //= 2
+        while node:
+            self._pull(node)
+            node //= 2
+    
+    def _pull(self, node: int):
+        """Recompute a tree node from its children."""
+        left, right = 2 * node, 2 * node + 1
+        self._total[node] = self._total[left] + self._total[right]
+        self._min_size[node] = min(self._min_size[left], self._min_size[right])
+    
+    def admit(self, capacity: int) -> List[Tuple[int, Optional[int]]]:
+        """
+        Greedy admission with backfill over the buckets in queue order.
+        
+        Returns:
+            (bucket position, unit count) per bucket that admits units, in queue order;
+            a count of None means all units of the bucket
+        """
+        admitted = []
+        # Depth-first walk, left to right: (tree node, first bucket position, bucket count)
+        stack = [(1, 0, self._leaves)]
+        while stack and capacity:
+            node, start, width = stack.pop()
+            if self._min_size[node] > capacity:
+                continue  # No unit in this range fits any more
+            if self._total[node] <= capacity:
+                # Everything in this range fits
+                admitted.extend((position, None) for position in range(start, start + width)
+                                if self._total[self._leaves + position])
+                capacity -= self._total[node]
+            elif width == 1:
+                # Bucket only partially fits: admit as many units as still fit
+                size = self._min_size[node]
+                admitted.append((start, capacity // size))
+                capacity %= size
+            else:
+                half = width // 2
+                stack.append((2 * node + 1, start + half, half))
+                stack.append((2 * node, start, half))
+        return admitted
+
+
+@dataclass(slots=True)
+class GangMembers:
+    """
+    Index entry for a gang: its members plus cached aggregates.
+    Lets reformation checks and gang unit construction avoid scanning all pods.
+    """
+    unit: SchedulingUnit  # Persistent scheduling unit for the gang
+    members: Dict[str, PodInfo] = field(default_factory=dict)  # pod_uid -> PodInfo, arrival order
+    min_priority: int = 0  # Running minimum priority of the members
+    waiting_count: int = 0  # Members currently waiting on deletion
+    unmanaged_count: int = 0  # Members running on nodes we do not manage
+
+
 class SchedulingLogic:
     """
     Pure scheduling logic with no Kubernetes dependencies.
@@ -59,50 +223,212 @@ class SchedulingLogic:
     - Priority-based scheduling (one pod per node)
     - Preemption of lower priority pods
     - Gang-scheduling for pod groups
+    
+    Given the same sequence of calls, the produced actions are deterministic, so an
+    optional journal (any object with append(record: dict), e.g. event_journal.EventJournal)
+    can record every input and output for offline replay.
     """
     
-    def __init__(self):
-        # Track available nodes: node_name -> pod_uid (None if available)
+    def __init__(self, journal=None):
+        # Optional write-ahead journal of inputs and actions (see _journaled)
+        self.journal = journal
+        
+        # Each node offers one or more slots, one pod per slot. Slot keys are the node
+        # name for single-slot nodes (the default) and "<node>#<i>" otherwise; the
+        # node of a slot is what binds and preempts target.
+        # Track available slots: slot -> pod_uid (None if available)
         self.node_assignments: Dict[str, Optional[str]] = {}
         
+        # Reverse index of node_assignments: pod_uid -> slot (assigned pods only)
+        self.pod_nodes: Dict[str, str] = {}
+        
+        # Slot keys of every known node: node_name -> slots
+        self._node_slots: Dict[str, List[str]] = {}
+        
+        # Min-heap of free slots, so binds take the lowest free slot in O(log N).
+        # Lazy deletion: assigned slots stay in the heap until popped and are skipped
+        # then; _free_heap_members prevents a slot from being pushed twice.
+        self._free_heap: List[str] = []
+        self._free_heap_members: Set[str] = set()
+        
+        # Slots of cordoned nodes that still run a pod. They stay in node_assignments
+        # until their pod leaves and are never handed out by the free-slot heap.
+        self.cordoned_slots: Set[str] = set()
+        self._cordon_reserve = 0  # Capacity of cordoned slots the current plan will give up
+        
         # Track ALL non-terminal pods: pod_uid -> PodInfo
         self.all_pods: Dict[str, PodInfo] = {}
         
-        # Ordered list of scheduling units (single pods or gangs) sorted by priority
-        self.scheduling_queue: List[SchedulingUnit] = []
+        # Pods observed running on nodes we do not manage: pod_uid -> node name. They are
+        # kept out of planning (binding them again would only conflict) until they are
+        # deleted or their node is added; a gang with such a member is not planned either.
+        self.unmanaged_pods: Dict[str, str] = {}
+        
+        # Schedulable units (single pods or gangs) bucketed by (-priority, size).
+        # Each bucket holds its units in arrival order (seq -> unit), a unit's seq
+        # being that of its earliest pod, so the order matches a full rebuild;
+        # _bucket_keys lists the non-empty buckets in queue order. Priorities and
+        # gang sizes take few distinct values, so there are few buckets.
+        self._buckets: Dict[Tuple[int, int], Dict[int, SchedulingUnit]] = {}
+        self._bucket_keys: List[Tuple[int, int]] = []
+        self._queue_seq = itertools.count()
+        
+        # Nodes needed per bucket and smallest unit size, indexed by bucket position.
+        # Point-updated when a bucket grows or shrinks; rebuilt by the next plan when
+        # a bucket appears or empties (positions shift).
+        self._capacity_tree = _CapacityTree()
+        self._capacity_tree_stale = False
+        
+        # Persistent single-pod units, including those currently not eligible for the queue
+        self._single_units: Dict[str, SchedulingUnit] = {}  # pod_uid -> unit
+        
+        # Gang membership index: gang_name -> members, cached min priority and waiting count
+        self.gang_members: Dict[str, GangMembers] = {}
         
         # Track gangs that are in transition (being reformed after preemption)
         self.gangs_in_transition: Set[str] = set()
         
+        # Plan-invariance tracking. After a plan, every admitted unit is bound and
+        # nothing else is, so until an assignment changes, an admitted unit leaves
+        # or changes, or a new unit could be admitted, replanning would change nothing.
+        self.plan_version = 0  # Bumped by every plan that differs from the previous one
+        self.plans_computed = 0  # Number of plans computed
+        self.skipped_replans = 0  # Replans skipped because the plan provably could not change
+        self._plan_dirty = True
+        self._planning = False
+        self._plan_admitted: Set[Tuple[int, int, int]] = set()  # Queue keys of admitted units
+        self._plan_cutoff: Optional[Tuple[int, int, int]] = None  # Queue key of the last admitted unit
+        self._plan_free_capacity = 0  # Slots left after the admitted units
+        
+        # Delta tracking against the previous plan (see _replan)
+        self._plan_units: Dict[str, dict] = {}  # Unit id -> {"gang_name", "pod_uids"} of the units admitted by the last plan
+        self._assignment_changes: Dict[str, Optional[str]] = {}  # pod_uid -> node at the last plan, for pods touched since
+        self._delta = _empty_delta()  # Delta of the plan computed by the current call
+        
         logger.info("Scheduling logic initialized")
     
     def _get_pod_node(self, pod_uid: str) -> Optional[str]:
         """Get the node assigned to a pod, if any."""
-        for node, uid in self.node_assignments.items():
-            if uid == pod_uid:
+        return self.pod_nodes.get(pod_uid)
+    
+    def _assign_node(self, node: str, pod_uid: str):
+        """Assign a pod to a node, keeping both directions of the assignment map in sync."""
+        # A pod occupies at most one node - release its previous node if it moved
+        previous_node = self.pod_nodes.get(pod_uid)
+        self._assignment_changes.setdefault(pod_uid, previous_node)
+        if previous_node is not None and previous_node != node:
+            self._release_node(previous_node)
+        
+        # Drop the reverse entry of the pod currently on the node, if any
+        previous_uid = self.node_assignments.get(node)
+        if previous_uid is not None and previous_uid != pod_uid:
+            self._assignment_changes.setdefault(previous_uid, node)
+            self.pod_nodes.pop(previous_uid, None)
+        
+        self.node_assignments[node] = pod_uid
+        self.pod_nodes[pod_uid] = node
+        
+        if not self._planning:
+            self._plan_dirty = True
+    
+    def _free_node(self, node: str):
+        """Mark a node as available, keeping both directions of the assignment map in sync."""
+        pod_uid = self.node_assignments.get(node)
+        if pod_uid is not None:
+            self._assignment_changes.setdefault(pod_uid, node)
+            self.pod_nodes.pop(pod_uid, None)
+            if not self._planning:
+                self._plan_dirty = True
+        self._release_node(node)
+    
+    def _release_node(self, node: str):
+        """Make an emptied slot available again, or drop it if it is cordoned."""
+        if node in self.cordoned_slots:
+            self.cordoned_slots.discard(node)
+            del self.node_assignments[node]
+            logger.debug("Cordoned slot %s is empty - removed from capacity", node)
+            return
+        self.node_assignments[node] = None
+        self._push_free_node(node)
+    
+    def _reset_nodes(self, nodes: Union[List[str], Dict[str, int]]):
+        """Start from the given nodes (names with one slot each, or name -> slots), all free."""
+        slots_by_node = nodes if isinstance(nodes, dict) else dict.fromkeys(nodes, 1)
+        self._node_slots = {node: _slot_keys(node, slots) for node, slots in slots_by_node.items()}
+        self.node_assignments = {slot: None for slots in self._node_slots.values() for slot in slots}
+        self.pod_nodes = {}
+        self.cordoned_slots = set()
+        self._free_heap = sorted(self.node_assignments)  # A sorted list is a valid heap
+        self._free_heap_members = set(self._free_heap)
+        
+        # Assignments start over, so the next plan is diffed against an empty one
+        self._plan_units = {}
+        self._assignment_changes = {}
+    
+    def _slot_for(self, node_name: str, pod_uid: str) -> Optional[str]:
+        """
+        Slot of a node that a pod observed on that node occupies. O(slots per node).
+        
+        The pod's current slot if it is already on the node, else a free slot, else the
+        first slot (the observed placement wins over our assumption, like for
+        single-slot nodes). None if the node is not managed.
+        """
+        current = self.pod_nodes.get(pod_uid)
+        if current is not None and _node_of(current) == node_name:
+            return current
+        
+        slots = [slot for slot in self._node_slots.get(node_name, ()) if slot in self.node_assignments]
+        for slot in slots:
+            if self.node_assignments[slot] is None:
+                return slot
+        return slots[0] if slots else None
+    
+    def _push_free_node(self, node: str):
+        """Add a freed node to the free-node heap. O(log N)."""
+        if node not in self._free_heap_members:
+            heapq.heappush(self._free_heap, node)
+            self._free_heap_members.add(node)
+    
+    def _pop_free_node(self) -> Optional[str]:
+        """Take the lowest free node name, skipping nodes assigned since they were pushed. O(log N) amortized."""
+        while self._free_heap:
+            node = heapq.heappop(self._free_heap)
+            self._free_heap_members.discard(node)
+            if node in self.node_assignments and self.node_assignments[node] is None:
                 return node
         return None
     
-    def initialize(self, nodes: List[str], existing_pods: List[dict]) -> dict:
+    @_journaled
+    def initialize(self, nodes: Union[List[str], Dict[str, int]], existing_pods: Iterable[dict],
+                   cordoned_nodes: Iterable[str] = (), plan_version: int = 0) -> dict:
         """
         Initialize the scheduler with current cluster state.
         
+        existing_pods is consumed once, so it can be a generator that streams pods
+        page by page without materializing the whole list (unless a journal is set).
+        
         Args:
-            nodes: List of node names ["node-1", "node-2", "node-3"]
-            existing_pods: List of pod dicts with keys:
+            nodes: List of node names ["node-1", "node-2", "node-3"] (one pod each), or
+                node name -> number of slots {"node-1": 4, "node-2": 1}
+            existing_pods: Iterable of pod dicts with keys:
                 - uid: str
                 - name: str
                 - namespace: str
                 - priority: int
                 - gang_name: str | None
+            cordoned_nodes: Nodes among `nodes` that are cordoned; they keep their running
+                pods (like NODE_CORDONED) but take no new ones
+            plan_version: Plan version to continue from, so plans of a re-initialized state
+                stay newer than actions of the previous state that may still be queued
         
         Returns:
-            Actions dict: {"actions": [{"action": "bind"|"preempt", ...}]}
+            Result dict (see _result): {"actions": [...], "plan_version": int, "delta": {...}}
         """
-        logger.info(f"Initializing with {len(nodes)} nodes and {len(existing_pods)} existing pods")
+        logger.info(f"Initializing with {len(nodes)} nodes")
+        self.plan_version = plan_version
         
         # Initialize node tracking
-        self.node_assignments = {node: None for node in nodes}
+        self._reset_nodes(nodes)
         
         # Process existing pods - track ALL non-terminal pods
         for pod_dict in existing_pods:
@@ -110,188 +436,963 @@ class SchedulingLogic:
             node_name = pod_dict.get("node_name")
             
             # Create PodInfo (without node_name field)
-            pod_info = PodInfo(
-                uid=pod_dict["uid"],
-                name=pod_dict["name"],
-                namespace=pod_dict["namespace"],
-                priority=pod_dict["priority"],
-                gang_name=pod_dict.get("gang_name"),
-                waiting_on_deletion=False  # Existing pods are not waiting on deletion
-            )
+            pod_info = self._to_pod_info(pod_dict)
             self.all_pods[pod_info.uid] = pod_info
             
             # Update node assignments for pods that are already assigned
-            if node_name and node_name in self.node_assignments:
-                self.node_assignments[node_name] = pod_info.uid
+            slot = self._slot_for(node_name, pod_info.uid) if node_name else None
+            if slot is not None:
+                self._assign_node(slot, pod_info.uid)
+            elif node_name:
+                self.unmanaged_pods[pod_info.uid] = node_name
         
-        logger.info(f"Initialized: {len(self.all_pods)} total pods, "
-                   f"{sum(1 for v in self.node_assignments.values() if v)} assigned to nodes")
+        for node_name in cordoned_nodes:
+            self._apply_node_event("NODE_CORDONED", node_name)
+        
+        logger.info(f"Initialized: {len(self.all_pods)} existing pods, "
+                   f"{len(self.pod_nodes)} assigned to nodes, {len(self.unmanaged_pods)} on unmanaged nodes")
+        
+        # Build the scheduling queue once; events keep it up to date afterwards
+        self._rebuild_scheduling_queue()
         
         # Create initial plan for pending pods
-        plan = self._create_scheduling_plan()
-        actions = self._plan_to_actions(plan)        
-        return {"actions": actions}
+        self._plan_dirty = True
+        actions = self._replan()
+        return self._result(actions)
+    
+    def to_snapshot(self) -> dict:
+        """
+        Serialize the scheduling state to a compact, JSON-compatible dict.
+        
+        Pods are stored as rows instead of dicts to keep snapshots of large
+        clusters small. Derived structures (queue, gang index, reverse map)
+        are not stored; restore() rebuilds them.
+        
+        Returns:
+            Snapshot dict for restore()
+        """
+        return {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "node_assignments": dict(self.node_assignments),
+            "pods": [
+                [p.uid, p.name, p.namespace, p.priority, p.gang_name, p.waiting_on_deletion]
+                for p in self.all_pods.values()
+            ],
+            "gangs_in_transition": sorted(self.gangs_in_transition),
+            "unmanaged_pods": dict(self.unmanaged_pods),
+            "plan_version": self.plan_version
+        }
     
+    def dump_state(self) -> str:
+        """
+        Render the full scheduling state as text, for on-demand debugging.
+        
+        Kept out of the event path on purpose: formatting every pod is O(P)
+        and costs megabytes of text on large clusters.
+        """
+        free_nodes = sum(1 for uid in self.node_assignments.values() if uid is None)
+        lines = [
+            f"Scheduling state: plan_version={self.plan_version}, plans_computed={self.plans_computed}, "
+            f"skipped_replans={self.skipped_replans}, "
+            f"{len(self.all_pods)} pods, {len(self.node_assignments)} slots ({free_nodes} free)",
+            "Node assignments:"
+        ]
+        for node, pod_uid in self.node_assignments.items():
+            pod_info = self.all_pods.get(pod_uid) if pod_uid else None
+            occupant = f"{pod_info.namespace}/{pod_info.name} ({pod_uid})" if pod_info else pod_uid or "-"
+            lines.append(f"  {node}: {occupant}")
+        
+        lines.append("Scheduling queue:")
+        for unit in self.scheduling_queue:
+            label = f"gang {unit.gang_name}" if unit.is_gang else f"{unit.pods[0].namespace}/{unit.pods[0].name}"
+            lines.append(f"  priority={unit.effective_priority} size={unit.required_nodes} {label}")
+        
+        waiting = [f"{p.namespace}/{p.name}" for p in self.all_pods.values() if p.waiting_on_deletion]
+        lines.append(f"Waiting on deletion: {', '.join(waiting) or '-'}")
+        lines.append(f"Gangs in transition: {', '.join(sorted(self.gangs_in_transition)) or '-'}")
+        lines.append(f"Cordoned slots still running a pod: {', '.join(sorted(self.cordoned_slots)) or '-'}")
+        unmanaged = [f"{self.all_pods[uid].namespace}/{self.all_pods[uid].name} on {node}"
+                     for uid, node in self.unmanaged_pods.items()]
+        lines.append(f"Pods on unmanaged nodes: {', '.join(unmanaged) or '-'}")
+        return "\n".join(lines)
+    
+    @_journaled
+    def restore(self, snapshot: dict, nodes: Union[List[str], Dict[str, int]],
+                cordoned_nodes: Iterable[str] = ()) -> dict:
+        """
+        Restore state from a to_snapshot() dict instead of initializing from a full pod list.
+        
+        Like initialize(), assignments are only kept for nodes in `nodes`; nodes that
+        appeared since the snapshot start out free. Equal-priority units are queued
+        in pod arrival order.
+        
+        Args:
+            snapshot: Dict produced by to_snapshot()
+            nodes: Current node names, or node name -> slots (see initialize)
+            cordoned_nodes: Nodes among `nodes` that are cordoned (see initialize)
+        
+        Returns:
+            Result dict (see _result): {"actions": [...], "plan_version": int, "delta": {...}}
+        """
+        if snapshot.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {snapshot.get('format_version')}")
+        
+        logger.info(f"Restoring snapshot with {len(snapshot['pods'])} pods onto {len(nodes)} nodes")
+        
+        self._reset_nodes(nodes)
+        self.plan_version = snapshot["plan_version"]
+        self.all_pods = {}
+        self.unmanaged_pods = {}
+        for uid, name, namespace, priority, gang_name, waiting_on_deletion in snapshot["pods"]:
+            self.all_pods[uid] = PodInfo(
+                uid=uid,
+                name=name,
+                namespace=sys.intern(namespace),
+                priority=priority,
+                gang_name=_intern_optional(gang_name),
+                waiting_on_deletion=waiting_on_deletion
+            )
+        
+        # Slots are matched by node, so nodes whose slot count changed keep their pods
+        for slot, pod_uid in snapshot["node_assignments"].items():
+            if pod_uid is None or pod_uid not in self.all_pods:
+                continue
+            new_slot = self._slot_for(_node_of(slot), pod_uid)
+            if new_slot is not None:
+                self._assign_node(new_slot, pod_uid)
+        
+        # Pods on unmanaged nodes stay out of planning; a node that is managed now adopts them
+        for pod_uid, node_name in snapshot["unmanaged_pods"].items():
+            if pod_uid not in self.all_pods:
+                continue
+            slot = self._slot_for(node_name, pod_uid)
+            if slot is not None:
+                self._assign_node(slot, pod_uid)
+            else:
+                self.unmanaged_pods[pod_uid] = node_name
+        
+        for node_name in cordoned_nodes:
+            self._apply_node_event("NODE_CORDONED", node_name)
+        
+        self.gangs_in_transition = set(snapshot["gangs_in_transition"]) & {
+            p.gang_name for p in self.all_pods.values() if p.gang_name
+        }
+        
+        logger.info(f"Restored: {len(self.all_pods)} pods, {len(self.pod_nodes)} assigned to nodes")
+        
+        self._rebuild_scheduling_queue()
+        
+        # Plan for pods that were pending when the snapshot was taken
+        self._plan_dirty = True
+        actions = self._replan()
+        return self._result(actions)
+    
+    @_journaled
     def handle_event(self, event: dict) -> dict:
         """
-        Process a pod event and return scheduling actions.
+        Process a pod or node event and return scheduling actions.
         
         Args:
             event: Dict with keys:
-                - event_type: "ADDED" | "DELETED"
-                - pod: Dict with pod info (same format as initialize)
+                - event_type: "ADDED" | "DELETED", or a node event
+                  "NODE_ADDED" | "NODE_REMOVED" | "NODE_CORDONED" (see _apply_node_event)
+                - pod: Dict with pod info (same format as initialize), for pod events
+                - node_name: str, for node events
+                - slots: int, pod slots of the node for NODE_ADDED (default 1)
+        
+        Returns:
+            Result dict (see _result): {"actions": [...], "plan_version": int, "delta": {...}}
+        """
+        if not self._apply_event(event):
+            return self._result([])
+        
+        # Create and return new plan
+        actions = self._replan()
+
+        return self._result(actions)
+    
+    @_journaled
+    def handle_events(self, events: List[dict]) -> dict:
+        """
+        Process a batch of pod events and return scheduling actions for the whole batch.
+        
+        All events are applied to state in order, then a single plan is created.
+        The resulting state matches processing the events one by one with handle_event,
+        except that intermediate plans (binds that a later event would have preempted)
+        are never produced.
+        
+        Args:
+            events: List of event dicts (same format as handle_event)
+        
+        Returns:
+            Result dict (see _result): {"actions": [...], "plan_version": int, "delta": {...}}
+        """
+        needs_plan = False
+        for event in events:
+            if self._apply_event(event):
+                needs_plan = True
+        
+        if not needs_plan:
+            return self._result([])
+        
+        logger.debug("Planning once for a batch of %d events", len(events))
+        actions = self._replan()
+
+        return self._result(actions)
+    
+    @_journaled
+    def handle_action_results(self, results: List[dict]) -> dict:
+        """
+        Apply the outcome of executed actions and return follow-up actions.
+        
+        Successful actions already match the optimistic state set by _plan_to_actions.
+        A bind that failed with 404 means the pod is gone: it is forgotten and its node
+        is freed for other pods. A bind that failed because the pod is already on another
+        node (observed_pod given) is reconciled with resync_pod. Any other failed bind
+        reverts the optimistic assignment so the pod is pending again and is
+        planned again by this call.
+        
+        A preempt reported as cancelled was dropped because the pod's bind never ran
+        (see ActionExecutor.cancel_stale): the pod is still pending, so it stops waiting
+        on deletion and is planned again.
+        
+        Args:
+            results: List of dicts with keys:
+                - action: the action dict that was executed (or cancelled)
+                - success: bool
+                - status: HTTP status of the failure, if any
+                - observed_pod: optional pod dict read back from the cluster
+                - cancelled: optional, True if the action was not executed
+        
+        Returns:
+            Result dict (see _result): {"actions": [...], "plan_version": int, "delta": {...}}
+        """
+        needs_plan = False
+        actions = []
+        
+        for result in results:
+            action = result["action"]
+            if action["action"] == "preempt" and result.get("cancelled"):
+                pod_info = self.all_pods.get(action["pod_uid"])
+                if pod_info is not None and pod_info.waiting_on_deletion:
+                    self._unmark_waiting_on_deletion(pod_info)
+                    needs_plan = True
+                continue
+            if result["success"] or action["action"] != "bind":
+                continue
+            
+            pod_uid = action["pod_uid"]
+            pod_info = self.all_pods.get(pod_uid)
+            if pod_info is None:
+                continue
+            
+            if result.get("status") == 404:
+                logger.warning(f"Pod {pod_info.namespace}/{pod_info.name} no longer exists - removing from state")
+                self._handle_deleted(pod_info)
+                needs_plan = True
+            elif result.get("observed_pod"):
+                actions.extend(self._resync_pod(result["observed_pod"]))
+                needs_plan = True
+            elif _node_of(self.pod_nodes.get(pod_uid, "")) == action["node_name"]:
+                logger.warning(f"Bind of {pod_info.namespace}/{pod_info.name} to {action['node_name']} failed - "
+                               f"reverting assignment")
+                self._free_node(self.pod_nodes[pod_uid])
+                needs_plan = True
+        
+        if not needs_plan:
+            return self._result([])
+        
+        actions.extend(self._replan())
+
+        return self._result(actions)
+    
+    @_journaled
+    def resync_pod(self, pod_dict: dict) -> dict:
+        """
+        Reconcile a single pod with the node it was observed on in the cluster.
+        
+        Used when the cluster disagrees with our optimistic state (e.g. a bind conflict
+        shows the pod on another node). Only this pod's assignment and the node it
+        conflicts with are touched, instead of rebuilding all state.
+        
+        Args:
+            pod_dict: Pod dict (same format as handle_event) with the observed node_name
+        
+        Returns:
+            Result dict (see _result): {"actions": [...], "plan_version": int, "delta": {...}}
+        """
+        actions = self._resync_pod(pod_dict)
+        
+        actions.extend(self._replan())
+
+        return self._result(actions)
+    
+    def _resync_pod(self, pod_dict: dict) -> List[dict]:
+        """
+        Move a pod's assignment to its observed node without planning. O(1).
+        
+        - The pod's previously assumed slot is freed if it is on another node
+        - If the observed node has no free slot, a different pod we assumed in the slot
+          it takes is preempted: its real location is unknown, and one pod per slot must hold
+        
+        Returns:
+            Preempt actions for evicted pods
+        """
+        actions = []
+        pod_info = self.all_pods.get(pod_dict["uid"])
+        if pod_info is None:
+            pod_info = self._to_pod_info(pod_dict)
+            self._add_pod(pod_info)
+        
+        observed_node = pod_dict.get("node_name")
+        previous_slot = self.pod_nodes.get(pod_info.uid)
+        logger.warning(f"Resyncing pod {pod_info.namespace}/{pod_info.name}: "
+                       f"assumed slot {previous_slot}, observed node {observed_node}")
+        
+        if previous_slot is not None and _node_of(previous_slot) != observed_node:
+            self._free_node(previous_slot)
+        
+        if observed_node is None:
+            self._clear_unmanaged(pod_info)
+            return actions
+        
+        observed_slot = self._slot_for(observed_node, pod_info.uid)
+        if observed_slot is None:
+            logger.warning(f"Pod {pod_info.namespace}/{pod_info.name} runs on unmanaged node {observed_node} - "
+                           f"not planning it until it is deleted or the node is added")
+            self._set_unmanaged(pod_info, observed_node)
+            return actions
+        
+        self._clear_unmanaged(pod_info)
+        
+        occupant_uid = self.node_assignments[observed_slot]
+        if occupant_uid is not None and occupant_uid != pod_info.uid:
+            occupant = self.all_pods.get(occupant_uid)
+            self._free_node(observed_slot)
+            if occupant is not None:
+                logger.warning(f"Evicting {occupant.namespace}/{occupant.name} from {observed_node} "
+                               f"(conflicts with {pod_info.namespace}/{pod_info.name})")
+                actions.append({
+                    "action": "preempt",
+                    "pod_uid": occupant.uid,
+                    "pod_name": occupant.name,
+                    "pod_namespace": occupant.namespace,
+                    "node_name": observed_node
+                })
+                self._mark_waiting_on_deletion(occupant)
+        
+        self._assign_node(observed_slot, pod_info.uid)
+        return actions
+    
+    def _to_pod_info(self, pod_dict: dict) -> PodInfo:
+        """
+        Create PodInfo from a pod dict (PodInfo doesn't have node_name field).
+        Namespace and gang names repeat across many pods, so they are interned.
+        """
+        return PodInfo(
+            uid=pod_dict["uid"],
+            name=pod_dict["name"],
+            namespace=sys.intern(pod_dict["namespace"]),
+            priority=pod_dict["priority"],
+            gang_name=_intern_optional(pod_dict.get("gang_name")),
+            waiting_on_deletion=False  # New/existing/observed pods are not waiting on deletion
+        )
+    
+    def _apply_event(self, event: dict) -> bool:
+        """
+        Apply a pod or node event to the scheduler state without planning.
         
         Returns:
-            Actions dict: {"actions": [{"action": "bind"|"preempt", ...}]}
+            True if a new plan should be created, False if the event was ignored
         """
         event_type = event["event_type"]
+        if event_type in NODE_EVENT_TYPES:
+            return self._apply_node_event(event_type, event["node_name"], event.get("slots", 1))
+        
         pod_dict = event["pod"]
         
         # Extract node_name before creating PodInfo (PodInfo doesn't have node_name field)
         node_name = pod_dict.get("node_name")
         
         # Create PodInfo (without node_name field)
-        pod_info = PodInfo(
-            uid=pod_dict["uid"],
-            name=pod_dict["name"],
-            namespace=pod_dict["namespace"],
-            priority=pod_dict["priority"],
-            gang_name=pod_dict.get("gang_name"),
-            waiting_on_deletion=False  # New/modified pods are not waiting on deletion
-        )
+        pod_info = self._to_pod_info(pod_dict)
         
-        logger.debug(f"Processing event {event_type} for pod {pod_info.namespace}/{pod_info.name} and node {node_name}")
-        # print state of all_pods
-        logger.debug(f"All pods: {self.all_pods}")
-        logger.debug(f"Node assignments: {self.node_assignments}")
+        # Lazy %-style arguments: nothing is formatted unless DEBUG is enabled.
+        # Full state is available on demand through dump_state().
+        logger.debug("Processing event %s for pod %s/%s and node %s",
+                     event_type, pod_info.namespace, pod_info.name, node_name)
 
         if event_type == "DELETED":
             self._handle_deleted(pod_info)
         elif event_type == "MODIFIED": # verify they are all boring events
             # check if the pod is already in the all_pods .. this happens when it's pending deletetion
             if pod_info.uid not in self.all_pods:
-                logger.debug(f"\tMODIFIED Pod {pod_info.namespace}/{pod_info.name} -> {node_name} pending deletion?")
-                return {"actions": []}
+                logger.debug("\tMODIFIED Pod %s/%s -> %s pending deletion?", pod_info.namespace, pod_info.name, node_name)
+                return False
+            
+            if pod_info.uid in self.unmanaged_pods:
+                return False
             
             # if node_name exists and node assignment is different from the one in the pod, throw an error
-            if node_name and self.node_assignments[node_name] != pod_info.uid:
-                logger.error(f"MODIFIED Pod {pod_info.namespace}/{pod_info.name} is assigned to node {node_name} but the node assignment is {self.node_assignments[node_name]}")
-                return {"actions": []}
+            assigned_slot = self.pod_nodes.get(pod_info.uid)
+            if node_name and (assigned_slot is None or _node_of(assigned_slot) != node_name):
+                logger.error(f"MODIFIED Pod {pod_info.namespace}/{pod_info.name} is assigned to node {node_name} but our assignment is {assigned_slot}")
+                return False
             
             # if node_names doesn't exist, it's unexpected, throw an error
             if not node_name:
                 logger.error(f"MODIFIED Pod {pod_info.namespace}/{pod_info.name} has no node_name")
-                return {"actions": []}
+                return False
         elif event_type == "ADDED":
             # Add/update the pod
-            self.all_pods[pod_info.uid] = pod_info
+            self._add_pod(pod_info)
             
             # Update node assignment if pod has one
-            if node_name and node_name in self.node_assignments:
-                self.node_assignments[node_name] = pod_info.uid
-                logger.debug(f"Pod {pod_info.namespace}/{pod_info.name} added to node {node_name} and reverse lookup in all_pods: {self.all_pods[pod_info.uid]}")
+            slot = self._slot_for(node_name, pod_info.uid) if node_name else None
+            if slot is not None:
+                self._assign_node(slot, pod_info.uid)
+                logger.debug("Pod %s/%s added to slot %s", pod_info.namespace, pod_info.name, slot)
+            elif node_name:
+                self._set_unmanaged(pod_info, node_name)
             
             # Check if this completes a gang reformation
             if pod_info.gang_name and pod_info.gang_name in self.gangs_in_transition:
                 self._check_gang_reformation_complete(pod_info.gang_name)
         
-        # Create and return new plan
-        plan = self._create_scheduling_plan()
-        actions = self._plan_to_actions(plan)
-
-        return {"actions": actions}
+        return True
+    
+    def _apply_node_event(self, event_type: str, node_name: str, slots: int = 1) -> bool:
+        """
+        Grow or shrink capacity for a node lifecycle event. O(slots log N).
+        
+        - NODE_ADDED: a new or uncordoned node makes its slots available; slots it
+          no longer offers (its slot count shrank) are cordoned, and pods observed
+          on it while it was unmanaged take their slots
+        - NODE_CORDONED: the node takes no new pods; empty slots leave capacity now,
+          occupied ones once their pod leaves (pods are not preempted for it)
+        - NODE_REMOVED: the node is gone; its pods are gone with it and are treated like
+          preempted pods waiting on deletion until their DELETED events arrive
+        
+        Returns:
+            True if capacity changed, False if the event did not change anything
+        """
+        logger.debug("Processing event %s for node %s", event_type, node_name)
+        changed = False
+        
+        if event_type == "NODE_ADDED":
+            # Keep the slots that still exist (occupied ones first) so a node whose slot
+            # count changes does not get fresh slots next to its running pods
+            existing = [slot for slot in self._node_slots.get(node_name, ()) if slot in self.node_assignments]
+            existing.sort(key=lambda slot: self.node_assignments[slot] is None)
+            slot_keys = existing[:slots]
+            slot_keys += [slot for slot in _slot_keys(node_name, slots + len(existing))
+                          if slot not in existing][:slots - len(slot_keys)]
+            
+            # Slots beyond the new count are cordoned; those still holding a pod stay
+            # listed so NODE_REMOVED finds them
+            for slot in existing[slots:]:
+                if slot not in self.cordoned_slots:
+                    self._cordon_slot(slot)
+                    changed = True
+            self._node_slots[node_name] = slot_keys + [slot for slot in existing[slots:]
+                                                       if slot in self.node_assignments]
+            
+            for slot in slot_keys:
+                if slot in self.cordoned_slots:
+                    self.cordoned_slots.discard(slot)
+                elif slot not in self.node_assignments:
+                    self.node_assignments[slot] = None
+                    self._push_free_node(slot)
+                else:
+                    continue
+                changed = True
+            
+            # Pods seen on the node before it was managed take their slots now
+            for pod_uid, observed_node in list(self.unmanaged_pods.items()):
+                slot = self._slot_for(node_name, pod_uid) if observed_node == node_name else None
+                if slot is not None:
+                    self._clear_unmanaged(self.all_pods[pod_uid])
+                    self._assign_node(slot, pod_uid)
+                    changed = True
+        else:
+            for slot in self._node_slots.get(node_name, ()):
+                if slot not in self.node_assignments:
+                    continue
+                if event_type == "NODE_CORDONED":
+                    if slot not in self.cordoned_slots:
+                        self._cordon_slot(slot)
+                        changed = True
+                elif event_type == "NODE_REMOVED":
+                    pod_info = self.all_pods.get(self.node_assignments[slot])
+                    if pod_info is not None and not pod_info.waiting_on_deletion:
+                        self._mark_waiting_on_deletion(pod_info)
+                    self.cordoned_slots.add(slot)  # Drop the slot instead of freeing it
+                    self._free_node(slot)
+                    changed = True
+            if event_type == "NODE_REMOVED":
+                self._node_slots.pop(node_name, None)
+        
+        if changed:
+            self._plan_dirty = True
+        return changed
+    
+    def _cordon_slot(self, slot: str):
+        """Stop handing out a slot: drop it now if free, else once its pod leaves."""
+        if self.node_assignments[slot] is None:
+            del self.node_assignments[slot]
+        else:
+            self.cordoned_slots.add(slot)
     
     def _check_gang_reformation_complete(self, gang_name: str):
         """
         Check if a gang in transition has completed reformation.
         A gang is complete when all members are present and none are waiting_on_deletion.
         """
-        gang_pods = [p for p in self.all_pods.values() if p.gang_name == gang_name]
+        entry = self.gang_members.get(gang_name)
         
-        # Check if any member is still waiting on deletion
-        if any(p.waiting_on_deletion for p in gang_pods):
-            logger.debug(f"Gang {gang_name} still has members waiting on deletion")
+        # Check if we have members (empty means all deleted, still in transition)
+        if entry is None or not entry.members:
+            logger.debug("Gang %s has no members yet", gang_name)
             return
         
-        # Check if we have members (empty means all deleted, still in transition)
-        if len(gang_pods) == 0:
-            logger.debug(f"Gang {gang_name} has no members yet")
+        # Check if any member is still waiting on deletion
+        if entry.waiting_count:
+            logger.debug("Gang %s still has members waiting on deletion", gang_name)
             return
         
         # Gang is complete - remove from transition
         self.gangs_in_transition.discard(gang_name)
-        logger.info(f"Gang {gang_name} reformation complete with {len(gang_pods)} members")
+        self._refresh_gang_unit(gang_name)
+        logger.info(f"Gang {gang_name} reformation complete with {len(entry.members)} members")
     
     def _handle_deleted(self, pod_info: PodInfo):
         """Handle a pod deletion event."""
         # Remove from all_pods
-        if pod_info.uid in self.all_pods:
-            del self.all_pods[pod_info.uid]
+        self._remove_pod(pod_info.uid)
         
         # Clear node assignment if it was scheduled
-        for node, uid in self.node_assignments.items():
-            if uid == pod_info.uid:
-                self.node_assignments[node] = None
-                logger.debug(f"Pod {pod_info.namespace}/{pod_info.name} deleted from node {node}")
-                break
+        node = self.pod_nodes.get(pod_info.uid)
+        if node is not None:
+            self._free_node(node)
+            logger.debug("Pod %s/%s deleted from node %s", pod_info.namespace, pod_info.name, node)
     
+    def _add_pod(self, pod_info: PodInfo):
+        """Track a pod and index it into its scheduling unit (replaces any previous entry)."""
+        if pod_info.uid in self.all_pods:
+            self._remove_pod(pod_info.uid)
+        self.all_pods[pod_info.uid] = pod_info
+        self._index_pod(pod_info)
     
-    def _rebuild_scheduling_queue(self):
-        """Rebuild the scheduling queue with ALL pods as SchedulingUnits."""
-        # Phase 1: Collect pods into groups (singles and gangs)
-        single_pods = []
-        gangs = {}  # gang_name -> list of PodInfo
+    def _remove_pod(self, pod_uid: str):
+        """Stop tracking a pod and drop it from its scheduling unit."""
+        pod_info = self.all_pods.pop(pod_uid, None)
+        if pod_info:
+            self._unindex_pod(pod_info)
+        self.unmanaged_pods.pop(pod_uid, None)
+    
+    def _mark_waiting_on_deletion(self, pod_info: PodInfo):
+        """Mark a preempted pod as waiting on deletion and take its unit out of the queue."""
+        pod_info.waiting_on_deletion = True
         
-        for pod_info in self.all_pods.values():
-            # Skip pods waiting on deletion
-            if pod_info.waiting_on_deletion:
-                continue
+        if pod_info.gang_name:
+            self.gang_members[pod_info.gang_name].waiting_count += 1
             
-            if pod_info.gang_name:
-                # Gang pod - collect by gang_name
-                if pod_info.gang_name not in gangs:
-                    gangs[pod_info.gang_name] = []
-                gangs[pod_info.gang_name].append(pod_info)
-            else:
-                # Single pod
-                single_pods.append(pod_info)
+            # If this is a gang member, mark the gang as in transition
+            self.gangs_in_transition.add(pod_info.gang_name)
+            logger.debug("Gang %s marked as in-transition", pod_info.gang_name)
+            self._refresh_gang_unit(pod_info.gang_name)
+        else:
+            self._dequeue(self._single_units[pod_info.uid])
+    
+    def _unmark_waiting_on_deletion(self, pod_info: PodInfo):
+        """Undo _mark_waiting_on_deletion for a pod whose preempt was cancelled."""
+        pod_info.waiting_on_deletion = False
         
-        # Phase 2: Create SchedulingUnits from collected pods
-        units = []
+        if pod_info.gang_name:
+            self.gang_members[pod_info.gang_name].waiting_count -= 1
+            self._check_gang_reformation_complete(pod_info.gang_name)
+            self._refresh_gang_unit(pod_info.gang_name)
+        elif pod_info.uid not in self.unmanaged_pods:
+            self._enqueue(self._single_units[pod_info.uid])
+    
+    def _set_unmanaged(self, pod_info: PodInfo, node_name: str):
+        """Record that a pod runs on a node we do not manage and take its unit out of the queue."""
+        if pod_info.uid in self.unmanaged_pods:
+            self.unmanaged_pods[pod_info.uid] = node_name
+            return
         
-        # Create units for single pods
-        for pod_info in single_pods:
+        self.unmanaged_pods[pod_info.uid] = node_name
+        if pod_info.gang_name:
+            self.gang_members[pod_info.gang_name].unmanaged_count += 1
+            self._refresh_gang_unit(pod_info.gang_name)
+        else:
+            self._dequeue(self._single_units[pod_info.uid])
+    
+    def _clear_unmanaged(self, pod_info: PodInfo):
+        """Undo _set_unmanaged for a pod that was seen unbound or on a managed node."""
+        if self.unmanaged_pods.pop(pod_info.uid, None) is None:
+            return
+        
+        if pod_info.gang_name:
+            self.gang_members[pod_info.gang_name].unmanaged_count -= 1
+            self._refresh_gang_unit(pod_info.gang_name)
+        elif not pod_info.waiting_on_deletion:
+            self._enqueue(self._single_units[pod_info.uid])
+    
+    def _index_pod(self, pod_info: PodInfo):
+        """Add a pod to its single or gang unit and requeue the unit. O(log U) for singles."""
+        pod_info.seq = next(self._queue_seq)
+        if pod_info.gang_name:
+            entry = self.gang_members.get(pod_info.gang_name)
+            if entry is None:
+                entry = GangMembers(
+                    unit=SchedulingUnit(
+                        pods=[],
+                        is_gang=True,
+                        effective_priority=pod_info.priority,
+                        gang_name=pod_info.gang_name
+                    ),
+                    min_priority=pod_info.priority
+                )
+                self.gang_members[pod_info.gang_name] = entry
+            
+            entry.members[pod_info.uid] = pod_info
+            entry.min_priority = min(entry.min_priority, pod_info.priority)
+            if pod_info.waiting_on_deletion:
+                entry.waiting_count += 1
+            if pod_info.uid in self.unmanaged_pods:
+                entry.unmanaged_count += 1
+            entry.unit.pods.append(pod_info)
+            self._refresh_gang_unit(pod_info.gang_name)
+        else:
             unit = SchedulingUnit(
                 pods=[pod_info],
                 is_gang=False,
                 effective_priority=pod_info.priority
             )
-            units.append(unit)
+            self._single_units[pod_info.uid] = unit
+            if not pod_info.waiting_on_deletion and pod_info.uid not in self.unmanaged_pods:
+                self._enqueue(unit)
+    
+    def _unindex_pod(self, pod_info: PodInfo):
+        """Remove a pod from its single or gang unit. O(gang size) for gang members."""
+        if pod_info.gang_name:
+            entry = self.gang_members.get(pod_info.gang_name)
+            if entry is None or entry.members.pop(pod_info.uid, None) is None:
+                return
+            
+            if pod_info.waiting_on_deletion:
+                entry.waiting_count -= 1
+            if pod_info.uid in self.unmanaged_pods:
+                entry.unmanaged_count -= 1
+            entry.unit.pods = list(entry.members.values())
+            
+            # Only recompute the minimum when the removed member could have been it
+            if entry.members and pod_info.priority == entry.min_priority:
+                entry.min_priority = min(p.priority for p in entry.members.values())
+            self._refresh_gang_unit(pod_info.gang_name)
+        else:
+            unit = self._single_units.pop(pod_info.uid, None)
+            if unit is not None:
+                self._dequeue(unit)
+    
+    def _refresh_gang_unit(self, gang_name: str):
+        """Re-evaluate a gang unit's priority and eligibility, and reposition it in the queue. O(log U)."""
+        entry = self.gang_members.get(gang_name)
+        if entry is None:
+            return
+        
+        unit = entry.unit
+        if not entry.members:
+            self._dequeue(unit)
+            del self.gang_members[gang_name]
+            return
+        
+        # Skip gang if it's in transition (being reformed after preemption)
+        if gang_name in self.gangs_in_transition:
+            logger.debug("Skipping gang %s - in transition after preemption", gang_name)
+            self._dequeue(unit)
+            unit.effective_priority = entry.min_priority
+            return
+        
+        # Skip gang if any member is waiting on deletion
+        if entry.waiting_count:
+            logger.debug("Skipping gang %s - has members waiting on deletion", gang_name)
+            self._dequeue(unit)
+            unit.effective_priority = entry.min_priority
+            return
+        
+        # Skip gang if a member runs on a node we do not manage (it cannot be placed whole)
+        if entry.unmanaged_count:
+            logger.debug("Skipping gang %s - has members on unmanaged nodes", gang_name)
+            self._dequeue(unit)
+            unit.effective_priority = entry.min_priority
+            return
+        
+        # Already queued at the right position - nothing to do
+        if unit.queue_key == (-entry.min_priority, unit.required_nodes, unit.pods[0].seq):
+            return
         
-        # Create units for gangs
-        for gang_name, gang_pods in gangs.items():
-            # Skip gang if any member is waiting on deletion
-            if any(p.waiting_on_deletion for p in gang_pods):
-                logger.debug(f"Skipping gang {gang_name} - has members waiting on deletion")
+        self._dequeue(unit)
+        unit.effective_priority = entry.min_priority
+        self._enqueue(unit)
+    
+    def _enqueue(self, unit: SchedulingUnit):
+        """
+        Insert a unit into the scheduling queue.
+        Higher priority first, then smaller units first, then arrival of the unit's
+        earliest pod. O(1) when the unit arrived last in its bucket, which all new
+        pods do; a unit moving buckets (a gang changing size or priority) may sort
+        its new bucket.
+        """
+        if unit.queue_key is not None:
+            return
+        key = (-unit.effective_priority, unit.required_nodes, unit.pods[0].seq)
+        bucket_key = key[:2]
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = self._buckets[bucket_key] = {}
+            insort(self._bucket_keys, bucket_key)
+            self._capacity_tree_stale = True
+        if bucket and key[2] < next(reversed(bucket)):
+            units = sorted([*bucket.items(), (key[2], unit)], key=lambda item: item[0])
+            bucket.clear()
+            bucket.update(units)
+        else:
+            bucket[key[2]] = unit
+        unit.queue_key = key
+        self._update_capacity(bucket_key)
+        
+        if not self._planning and not self._is_plan_neutral(unit):
+            self._plan_dirty = True
+    
+    def _dequeue(self, unit: SchedulingUnit):
+        """Remove a unit from the scheduling queue if it is queued. O(1) unless its bucket empties."""
+        if unit.queue_key is None:
+            return
+        if unit.queue_key in self._plan_admitted and not self._planning:
+            self._plan_dirty = True
+        bucket_key = unit.queue_key[:2]
+        bucket = self._buckets[bucket_key]
+        del bucket[unit.queue_key[2]]
+        if not bucket:
+            del self._buckets[bucket_key]
+            del self._bucket_keys[bisect_left(self._bucket_keys, bucket_key)]
+            self._capacity_tree_stale = True
+        else:
+            self._update_capacity(bucket_key)
+        unit.queue_key = None
+    
+    def _update_capacity(self, bucket_key: Tuple[int, int]):
+        """Refresh a bucket's total in the capacity tree. O(log B); deferred while the tree is stale."""
+        if not self._capacity_tree_stale:
+            size = bucket_key[1]
+            self._capacity_tree.update(bisect_left(self._bucket_keys, bucket_key),
+                                       len(self._buckets[bucket_key]) * size, size)
+    
+    @property
+    def scheduling_queue(self) -> List[SchedulingUnit]:
+        """All queued units in scheduling order (materialized; for inspection and tests)."""
+        return [unit for key in self._bucket_keys for unit in self._buckets[key].values()]
+    
+    def _rebuild_scheduling_queue(self):
+        """Rebuild the scheduling queue from scratch with ALL pods as SchedulingUnits."""
+        self._buckets = {}
+        self._bucket_keys = []
+        self._capacity_tree_stale = True
+        self._single_units = {}
+        self.gang_members = {}
+        
+        for pod_info in self.all_pods.values():
+            self._index_pod(pod_info)
+        
+        logger.debug("Rebuilt scheduling queue with %d units in %d buckets",
+                     sum(map(len, self._buckets.values())), len(self._bucket_keys))
+    
+    def _is_plan_neutral(self, unit: SchedulingUnit) -> bool:
+        """
+        True if a newly queued unit cannot be admitted by the next plan.
+        
+        A unit queued behind the last admitted unit only gets the capacity left
+        after the current plan; if it needs more, the greedy plan skips it and
+        every decision after it stays the same.
+        """
+        behind_cutoff = self._plan_cutoff is None or unit.queue_key > self._plan_cutoff
+        return behind_cutoff and unit.required_nodes > self._plan_free_capacity
+    
+    def _replan(self) -> List[dict]:
+        """
+        Create a plan and reconcile it into actions, unless nothing that could change
+        the plan happened since the last one.
+        
+        A plan that admits or evicts a unit, moves a pod or produces actions gets
+        a new plan_version; its delta against the previous plan is returned by
+        the public entry point through _result().
+        
+        Returns:
+            List of action dicts (empty when the replan was skipped)
+        """
+        if not self._plan_dirty:
+            self.skipped_replans += 1
+            logger.debug("Skipping replan - no plan-relevant change since the last plan")
+            return []
+        
+        self._planning = True
+        self._plan_admitted = set()
+        self._plan_cutoff = None
+        self._plan_free_capacity = 0
+        try:
+            plan = self._plan_with_cordoned_slots()
+            actions = self._plan_to_actions(plan)
+        finally:
+            self._planning = False
+            self._cordon_reserve = 0  # The cordoned nodes given up are gone now
+        
+        self._plan_dirty = False
+        self.plans_computed += 1
+        
+        delta = self._plan_delta(plan)
+        if actions or delta["admitted"] or delta["evicted"] or delta["moved"]:
+            self.plan_version += 1
+            self._delta = delta
+        return actions
+    
+    def _plan_delta(self, plan: List[SchedulingUnit]) -> dict:
+        """
+        Diff a new plan against the previous one and make it the baseline for the next diff.
+        
+        - admitted: units in the new plan that were not in the previous one
+        - evicted: units of the previous plan that are no longer admitted
+        - moved: pods whose node changed from one node to another since the previous plan
+          (a move between slots of the same node is not reported)
+        
+        O(admitted units + assignment changes since the previous plan).
+        """
+        previous_units = self._plan_units
+        units = {}
+        admitted = []
+        for unit in plan:
+            unit_id = unit.gang_name or unit.pods[0].uid
+            units[unit_id] = {"gang_name": unit.gang_name, "pod_uids": [pod.uid for pod in unit.pods]}
+            if unit_id not in previous_units:
+                admitted.append(units[unit_id])
+        
+        evicted = [entry for unit_id, entry in previous_units.items() if unit_id not in units]
+        
+        moved = []
+        for pod_uid, from_slot in self._assignment_changes.items():
+            to_slot = self.pod_nodes.get(pod_uid)
+            if from_slot is None or to_slot is None:
                 continue
-            
-            # Skip gang if it's in transition (being reformed after preemption)
-            if gang_name in self.gangs_in_transition:
-                logger.debug(f"Skipping gang {gang_name} - in transition after preemption")
+            from_node, to_node = _node_of(from_slot), _node_of(to_slot)
+            if from_node != to_node:
+                moved.append({"pod_uid": pod_uid, "from_node": from_node, "to_node": to_node})
+        
+        self._plan_units = units
+        self._assignment_changes = {}
+        return {"admitted": admitted, "evicted": evicted, "moved": moved}
+    
+    def _result(self, actions: List[dict]) -> dict:
+        """
+        Build the return value of a public entry point.
+        
+        Every action is tagged with the plan_version it belongs to, so consumers can
+        drop queued actions made stale by a newer plan. The delta describes how the
+        plan computed by this call differs from the previous plan (empty lists when
+        no new plan version was produced).
+        
+        Returns:
+            {"actions": [...], "plan_version": int,
+             "delta": {"admitted": [{"gang_name", "pod_uids"}], "evicted": [...],
+                       "moved": [{"pod_uid", "from_node", "to_node"}]}}
+        """
+        for action in actions:
+            action["plan_version"] = self.plan_version
+        delta, self._delta = self._delta, _empty_delta()
+        return {"actions": actions, "plan_version": self.plan_version, "delta": delta}
+    
+    def _capacity(self) -> int:
+        """Slots the plan may fill: all tracked slots, minus cordoned ones the plan gives up."""
+        return len(self.node_assignments) - self._cordon_reserve
+    
+    def _plan_with_cordoned_slots(self) -> List[SchedulingUnit]:
+        """
+        Create a plan that accounts for cordoned slots.
+        
+        A cordoned slot only counts as capacity while its pod stays admitted; if the
+        plan evicts that pod, the slot disappears instead of taking another pod. So
+        the plan is recomputed with the lost slots reserved until no further cordoned
+        slot is lost. The reserve only grows, which bounds the loop by the number of
+        cordoned slots; without cordoned slots this is a single plan.
+        
+        The smaller capacity can admit cordoned pods again, so the final plan may lose
+        fewer slots than were reserved. Those slots are free, and queued units are
+        backfilled into them, so the plan never leaves a slot idle because of the reserve.
+        """
+        self._cordon_reserve = 0
+        plan = self._create_scheduling_plan()
+        self._record_plan_pass(plan, self._capacity() - self._nodes_needed(plan))
+        lost = self._lost_cordoned_slots(plan)
+        
+        while lost > self._cordon_reserve:
+            self._cordon_reserve = lost
+            plan = self._create_scheduling_plan()
+            self._record_plan_pass(plan, self._capacity() - self._nodes_needed(plan))
+            lost = self._lost_cordoned_slots(plan)
+        
+        if lost < self._cordon_reserve:
+            plan = self._backfill_plan(plan, len(self.node_assignments) - lost - self._nodes_needed(plan))
+        return plan
+    
+    def _lost_cordoned_slots(self, plan: List[SchedulingUnit]) -> int:
+        """Cordoned slots whose pod is not in the plan, i.e. that leave capacity with it. O(plan size)."""
+        if not self.cordoned_slots:
+            return 0
+        pods_in_plan = {pod.uid for unit in plan for pod in unit.pods}
+        return sum(1 for slot in self.cordoned_slots if self.node_assignments[slot] not in pods_in_plan)
+    
+    @staticmethod
+    def _nodes_needed(plan: List[SchedulingUnit]) -> int:
+        """Slots taken by the units of a plan."""
+        return sum(unit.required_nodes for unit in plan)
+    
+    def _backfill_plan(self, plan: List[SchedulingUnit], free: int) -> List[SchedulingUnit]:
+        """
+        Admit queued units that are not in the plan into `free` spare slots, in queue order.
+        
+        Admitting a unit never evicts one, so the plan loses no further cordoned slot,
+        and one whose pod runs on a lost cordoned slot keeps that slot.
+        O(buckets + planned units).
+        """
+        planned = {unit.queue_key for unit in plan}
+        extra = []
+        for key in self._bucket_keys:
+            if key[1] > free:
                 continue
-            
-            min_priority = min(p.priority for p in gang_pods)
-            unit = SchedulingUnit(
-                pods=gang_pods,
-                is_gang=True,
-                effective_priority=min_priority,
-                gang_name=gang_name
-            )
-            units.append(unit)
+            for unit in self._buckets[key].values():
+                if unit.queue_key in planned:
+                    continue
+                if unit.required_nodes > free:
+                    break
+                extra.append(unit)
+                kept = sum(1 for pod in unit.pods if self.pod_nodes.get(pod.uid) in self.cordoned_slots)
+                free -= unit.required_nodes - kept
         
-        # Sort by priority (higher first, then smaller units first)
-        self.scheduling_queue = sorted(units)
-        logger.debug(f"Rebuilt scheduling queue with {len(self.scheduling_queue)} units")
+        self._record_plan_pass(extra, free)
+        return plan + extra
+    
+    def _record_plan_pass(self, plan: List[SchedulingUnit], free: int):
+        """
+        Widen the plan-invariance bounds (see _is_plan_neutral) by one planning pass.
+        
+        With cordoned slots a plan takes several passes. A new unit only leaves the
+        plan unchanged if no pass would admit it, so the bounds cover every pass:
+        all admitted units, the furthest cutoff and the most capacity left over.
+        """
+        self._plan_admitted.update(unit.queue_key for unit in plan)
+        if plan and (self._plan_cutoff is None or plan[-1].queue_key > self._plan_cutoff):
+            self._plan_cutoff = plan[-1].queue_key
+        self._plan_free_capacity = max(self._plan_free_capacity, free)
     
     def _create_scheduling_plan(self) -> List[SchedulingUnit]:
         """
@@ -300,22 +1401,23 @@ class SchedulingLogic:
         This is a pure function that only checks capacity - it doesn't assign
         specific nodes. Returns priority-ordered list of units that fit.
         
+        Greedy with backfill: in queue order, every unit that still fits is admitted.
+        All units of a bucket have the same size, so a bucket either admits its first
+        remaining // size units or is skipped whole. The capacity tree admits runs of
+        buckets that fit entirely and skips runs where no unit fits in O(log B) each,
+        so buckets behind the cutoff are not visited one by one.
+        O(log B per partially admitted bucket + admitted units).
+        
         Returns: List[SchedulingUnit] - units that can fit in cluster
         """
-        # Rebuild the scheduling queue before creating a plan 
-        self._rebuild_scheduling_queue()
-
-        plan = []
-        nodes_needed = 0
-        total_nodes = len(self.node_assignments)
+        if self._capacity_tree_stale:
+            self._capacity_tree.rebuild([(len(self._buckets[key]) * key[1], key[1]) for key in self._bucket_keys])
+            self._capacity_tree_stale = False
         
-        # Process scheduling units in priority order (queue is already sorted)
-        for unit in self.scheduling_queue:
-            # Check if we have enough total capacity for this unit
-            if nodes_needed + unit.required_nodes <= total_nodes:
-                plan.append(unit)
-                nodes_needed += unit.required_nodes
-            # else: not enough capacity, skip this and all lower priority units
+        plan = []
+        for position, count in self._capacity_tree.admit(self._capacity()):
+            units = self._buckets[self._bucket_keys[position]].values()
+            plan.extend(units if count is None else itertools.islice(units, count))
         
         return plan
     
@@ -333,11 +1435,10 @@ class SchedulingLogic:
         
         # Step 1: Identify which pods are in the plan
         pods_in_plan = {pod.uid for unit in plan for pod in unit.pods}
-        logger.debug(f"Pods in plan: {pods_in_plan}")
+        logger.debug("%d pods in plan", len(pods_in_plan))
         
         # Step 2: Preempt pods not in plan (lower priority or no longer exist)
         preempted_pods = []
-        logger.debug(f"Node assignments: {self.node_assignments}")
         for node, pod_uid in list(self.node_assignments.items()):
             if pod_uid and pod_uid not in pods_in_plan:
                 pod_info = self.all_pods.get(pod_uid)
@@ -346,26 +1447,21 @@ class SchedulingLogic:
                         "action": "preempt",
                         "pod_uid": pod_uid,
                         "pod_name": pod_info.name,
-                        "pod_namespace": pod_info.namespace
+                        "pod_namespace": pod_info.namespace,
+                        "node_name": _node_of(node)
                     })
                     preempted_pods.append(pod_uid)
                     
-                    # Mark pod as waiting on deletion
-                    self.all_pods[pod_uid].waiting_on_deletion = True
-                    
-                    # If this is a gang member, mark the gang as in transition
-                    if pod_info.gang_name:
-                        self.gangs_in_transition.add(pod_info.gang_name)
-                        logger.debug(f"Gang {pod_info.gang_name} marked as in-transition")
+                    # Mark pod as waiting on deletion (also puts its gang in transition)
+                    self._mark_waiting_on_deletion(pod_info)
                 else:
                     logger.error(f"Pod {pod_uid} not found in all_pods")
-                self.node_assignments[node] = None  # Free the node
+                self._free_node(node)  # Free the node
                 
-        logger.debug(f"Preempted pods: {preempted_pods}")
+        logger.debug("Preempted pods: %s", preempted_pods)
 
-        # Step 3: Find available nodes (not assigned or just freed)
-        available_nodes = sorted([node for node, uid in self.node_assignments.items() if uid is None])
-        logger.debug(f"Available nodes: {available_nodes}")
+        # Step 3: Available slots (not assigned or just freed) come from the free-slot heap,
+        # lowest key first, so multi-slot nodes are filled one after another
 
         # Step 4: Assign pods that need nodes (preserve existing valid assignments)
         for unit in plan:
@@ -374,33 +1470,27 @@ class SchedulingLogic:
                 assigned_node = self._get_pod_node(pod.uid)
                 if assigned_node:
                     # Pod is already correctly assigned, keep it (no need to check again - _get_pod_node already verified it)
-                    logger.debug(f"Pod {pod.uid} is already correctly assigned to node {assigned_node}")
+                    logger.debug("Pod %s is already correctly assigned to node %s", pod.uid, assigned_node)
                     continue
                 
-                # Pod needs assignment (or reassignment)
-                if not available_nodes:
+                # Pod needs assignment (or reassignment). The heap only hands out
+                # unoccupied nodes, so a bind never displaces a pod that should be kept.
+                node = self._pop_free_node()
+                if node is None:
                     logger.error(f"No available nodes for pod {pod.uid} - capacity calculation error")
                     break
                 
-                node = available_nodes.pop(0)
-                
-                # Check if we need to preempt current occupant (shouldn't happen after step 2)
-                # It's better to fail here than to preempt a pod that should be kept.
-                if self.node_assignments[node]:
-                    logger.error(f"Logic error: node {node} is already assigned to pod {self.node_assignments[node]}")
-                    break
-                
-                # Bind pod to node
+                # Bind pod to the slot's node
                 actions.append({
                     "action": "bind",
                     "pod_uid": pod.uid,
                     "pod_name": pod.name,
                     "pod_namespace": pod.namespace,
-                    "node_name": node
+                    "node_name": _node_of(node)
                 })
                 
                 # Optimistically update state
-                self.node_assignments[node] = pod.uid
+                self._assign_node(node, pod.uid)
         
         return actions
 
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Persistent storage for SchedulingLogic snapshots.
+Snapshots are tagged with the resourceVersion they reflect so a restarted
+scheduler can resume its watch instead of re-listing every pod.
+No Kubernetes dependencies.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Optional, Tuple
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class StateSnapshotStore:
+    """
+    Reads and writes a single snapshot file.
+
+    Writes go to a temporary file that is fsynced and atomically renamed over
+    the previous snapshot, so a crash mid-write never leaves a torn file behind.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp_path = f"{path}.tmp"
+
+        # Metrics
+        self.writes = 0
+        self.last_write_bytes = 0
+        self.last_write_seconds = 0.0
+
+    def save(self, state: dict, resource_version: str):
+        """
+        Atomically replace the snapshot file.
+
+        Args:
+            state: Dict produced by SchedulingLogic.to_snapshot()
+            resource_version: Pod resourceVersion the state reflects
+        """
+        start = time.monotonic()
+        data = json.dumps({
+            "resource_version": resource_version,
+            "written_at": time.time(),
+            "state": state
+        }, separators=(",", ":")).encode()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(self._tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self._tmp_path, self.path)
+
+        self.writes += 1
+        self.last_write_bytes = len(data)
+        self.last_write_seconds = time.monotonic() - start
+        logger.debug(f"Wrote snapshot at resourceVersion {resource_version} "
+                     f"({len(data)} bytes in {self.last_write_seconds:.3f}s)")
+
+    def load(self) -> Optional[Tuple[dict, str]]:
+        """
+        Read the snapshot file.
+
+        Returns:
+            (state, resource_version), or None if there is no usable snapshot
+        """
+        try:
+            with open(self.path, "rb") as f:
+                snapshot = json.loads(f.read())
+        except FileNotFoundError:
+            logger.info(f"No state snapshot at {self.path}")
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable state snapshot {self.path}: {e}")
+            return None
+
+        if not isinstance(snapshot, dict) or not snapshot.get("resource_version") or "state" not in snapshot:
+            logger.warning(f"Ignoring malformed state snapshot {self.path}")
+            return None
+
+        age = time.time() - snapshot.get("written_at", 0)
+        logger.info(f"Loaded state snapshot at resourceVersion {snapshot['resource_version']} ({age:.0f}s old)")
+        return snapshot["state"], snapshot["resource_version"]
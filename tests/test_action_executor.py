@@ -0,0 +1,109 @@
+"""
+Unit tests for the concurrent action executor (pure Python, no K8s mocking).
+"""
+
+import threading
+import time
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scheduler'))
+
+from action_executor import ActionExecutor, ActionResult
+
+
+class TestActionExecutor(unittest.TestCase):
+    """Test cases for ActionExecutor."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.lock = threading.Lock()
+        self.log = []
+        self.results = []
+    
+    def _action(self, action_type, pod, node):
+        """Create an action dict."""
+        return {
+            "action": action_type,
+            "pod_uid": f"uid-{pod}",
+            "pod_name": pod,
+            "pod_namespace": "default",
+            "node_name": node
+        }
+    
+    def _run_action(self, action):
+        """Record start/end of each action; preempts are slow to expose ordering bugs."""
+        with self.lock:
+            self.log.append(("start", action["action"], action["node_name"]))
+        time.sleep(0.05 if action["action"] == "preempt" else 0.01)
+        with self.lock:
+            self.log.append(("end", action["action"], action["node_name"]))
+        return ActionResult(action=action, success=action["pod_name"] != "bad")
+    
+    def _on_result(self, result):
+        """Collect reported results."""
+        with self.lock:
+            self.results.append(result)
+    
+    def test_preempt_completes_before_bind_on_same_node(self):
+        """Test that a bind waits for the preempt on its node."""
+        executor = ActionExecutor(self._run_action, max_workers=4)
+        executor.submit([
+            self._action("preempt", "victim", "node-1"),
+            self._action("bind", "winner", "node-1"),
+        ], self._on_result)
+        
+        self.assertTrue(executor.wait_idle(timeout=5))
+        self.assertLess(self.log.index(("end", "preempt", "node-1")),
+                        self.log.index(("start", "bind", "node-1")))
+        executor.shutdown()
+    
+    def test_ordering_holds_across_submits(self):
+        """Test that a bind submitted later still waits for an in-flight preempt."""
+        executor = ActionExecutor(self._run_action, max_workers=4)
+        executor.submit([self._action("preempt", "victim", "node-1")], self._on_result)
+        executor.submit([self._action("bind", "winner", "node-1")], self._on_result)
+        
+        self.assertTrue(executor.wait_idle(timeout=5))
+        self.assertEqual(self.log, [
+            ("start", "preempt", "node-1"), ("end", "preempt", "node-1"),
+            ("start", "bind", "node-1"), ("end", "bind", "node-1"),
+        ])
+        executor.shutdown()
+    
+    def test_different_nodes_run_concurrently_and_report_results(self):
+        """Test that actions on different nodes overlap and every result is reported."""
+        executor = ActionExecutor(self._run_action, max_workers=4)
+        executor.submit([self._action("preempt", f"pod-{i}", f"node-{i}") for i in range(4)]
+                        + [self._action("bind", "bad", "node-9")], self._on_result)
+        
+        self.assertTrue(executor.wait_idle(timeout=5))
+        first_end = min(i for i, entry in enumerate(self.log) if entry[0] == "end")
+        starts_before_first_end = [e for e in self.log[:first_end] if e[0] == "start"]
+        self.assertGreater(len(starts_before_first_end), 1)
+        
+        self.assertEqual(len(self.results), 5)
+        failed = [r.action["pod_name"] for r in self.results if not r.success]
+        self.assertEqual(failed, ["bad"])
+        self.assertEqual(executor.outstanding, 0)
+        executor.shutdown()
+    
+    def test_cancel_stale_drops_only_older_queued_binds(self):
+        """Test that queued binds from an older plan version are dropped and newer ones kept."""
+        executor = ActionExecutor(self._run_action, max_workers=4)
+        stale = dict(self._action("bind", "stale", "node-1"), plan_version=1)
+        current = dict(self._action("bind", "current", "node-1"), plan_version=2)
+        executor.submit([dict(self._action("preempt", "victim", "node-1"), plan_version=1), stale, current],
+                        self._on_result)
+        
+        self.assertEqual(executor.cancel_stale(["uid-stale", "uid-current", "uid-victim"], 2), {"uid-stale"})
+        
+        self.assertTrue(executor.wait_idle(timeout=5))
+        self.assertEqual([r.action["pod_name"] for r in self.results], ["victim", "current"])
+        self.assertEqual(executor.cancelled_stale, 1)
+        self.assertEqual(executor.outstanding, 0)
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
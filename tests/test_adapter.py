@@ -0,0 +1,395 @@
+"""
+Unit tests for the Kubernetes adapter with a mocked API client (needs the kubernetes client).
+"""
+
+import threading
+import time
+import unittest
+import sys
+import os
+from unittest import mock
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scheduler'))
+
+try:
+    import scheduler
+except ImportError:
+    scheduler = None
+
+
+def _pod(uid, priority=0, gang_name=None, node_name=None):
+    """Create a pod dictionary."""
+    return {
+        "uid": uid,
+        "name": uid,
+        "namespace": "default",
+        "priority": priority,
+        "gang_name": gang_name,
+        "node_name": node_name
+    }
+
+
+def _v1_pod(uid, node_name=None, phase="Pending", scheduler_name="custom-scheduler",
+            priority=None, annotations=None):
+    """Create a V1Pod model."""
+    client = scheduler.client
+    return client.V1Pod(
+        metadata=client.V1ObjectMeta(uid=uid, name=uid, namespace="default", annotations=annotations),
+        spec=client.V1PodSpec(containers=[], node_name=node_name, scheduler_name=scheduler_name,
+                              priority=priority),
+        status=client.V1PodStatus(phase=phase)
+    )
+
+
+def _pod_list(pods, resource_version="1", continue_token=None):
+    """Create a V1PodList page."""
+    client = scheduler.client
+    return client.V1PodList(items=pods, metadata=client.V1ListMeta(resource_version=resource_version,
+                                                                     _continue=continue_token))
+
+
+def _v1_node(name, unschedulable=None, resource_version="1"):
+    """Create a V1Node model."""
+    client = scheduler.client
+    return client.V1Node(metadata=client.V1ObjectMeta(name=name, resource_version=resource_version),
+                         spec=client.V1NodeSpec(unschedulable=unschedulable))
+
+
+@unittest.skipIf(scheduler is None, "kubernetes client not installed")
+class AdapterTestCase(unittest.TestCase):
+    """Base class: a CustomScheduler whose CoreV1Api is a mock."""
+    
+    def setUp(self):
+        with mock.patch.object(scheduler.client, "CoreV1Api"):
+            self.sched = scheduler.CustomScheduler()
+        self.v1 = self.sched.v1
+    
+    def tearDown(self):
+        self.sched.executor.shutdown()
+
+
+class TestApplyLogicResult(AdapterTestCase):
+    """Test cases for handing logic results to the executor."""
+    
+    def test_cancelled_bind_drops_its_preempt(self):
+        """Test that a pod whose queued bind is cancelled is not deleted but planned again."""
+        self.sched.executor = mock.Mock()
+        self.sched.executor.cancel_stale.return_value = {"uid-1"}
+        self.sched.logic.initialize(["node-1"], [_pod("uid-1", priority=10)])
+        
+        result = self.sched.logic.handle_event({"event_type": "ADDED", "pod": _pod("uid-2", priority=100)})
+        self.sched._apply_logic_result(result)
+        
+        self.sched.executor.cancel_stale.assert_called_once_with(["uid-1"], result["plan_version"])
+        submitted = self.sched.executor.submit.call_args.args[0]
+        self.assertEqual([(a["action"], a["pod_uid"]) for a in submitted], [("bind", "uid-2")])
+        self.assertFalse(self.sched.logic.all_pods["uid-1"].waiting_on_deletion)
+        self.assertEqual(self.sched.plan_version, result["plan_version"])
+    
+    def test_reinitialize_continues_plan_versions(self):
+        """Test that plans of a re-initialized logic are newer than the previous state's."""
+        self.v1.list_node.return_value = mock.Mock(items=[], metadata=mock.Mock(resource_version="1"))
+        self.sched._list_pods = mock.Mock(return_value=[])
+        self.sched.plan_version = 5
+        
+        self.sched.logic = self.sched._new_logic()
+        self.sched.initialize_cluster_state()
+        
+        self.assertEqual(self.sched.logic.plan_version, 5)
+
+
+
+class TestPodDecoding(AdapterTestCase):
+    """Test cases for decoding pods from models and from raw JSON."""
+    
+    def test_raw_decoding_matches_model_decoding(self):
+        """Test that a raw JSON pod decodes to the same dict as its V1Pod model."""
+        pods = [
+            _v1_pod("uid-1"),
+            _v1_pod("uid-2", node_name="node-1", phase="Running", priority=7),
+            _v1_pod("uid-3", priority=7, annotations={"priority": "50", "pod-group": "gang-a"}),
+            _v1_pod("uid-4", priority=3, annotations={"priority": "high"}),
+            _v1_pod("uid-5", scheduler_name="default-scheduler", annotations={}),
+        ]
+        api_client = scheduler.client.ApiClient()
+        
+        for pod in pods:
+            with self.subTest(uid=pod.metadata.uid):
+                raw = api_client.sanitize_for_serialization(pod)
+                self.assertEqual(self.sched._decode_pod(raw), self.sched._decode_pod(pod))
+
+
+class TestClassifyApiError(AdapterTestCase):
+    """Test cases for deciding which API errors are retried."""
+    
+    def test_classification(self):
+        """Test throttling, server, client and transport errors, with and without Retry-After."""
+        ApiException = scheduler.ApiException
+        throttled = ApiException(status=429)
+        throttled.headers = {"Retry-After": "2"}
+        dated = ApiException(status=503)
+        dated.headers = {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        cases = [
+            (throttled, (True, 2.0)),
+            (dated, (True, None)),
+            (ApiException(status=500), (True, None)),
+            (ApiException(status=403), (False, None)),
+            (ApiException(status=404), (False, None)),
+            (ApiException(status=409), (False, None)),
+            (scheduler.TransportError("connection reset"), (True, None)),
+            (ConnectionResetError(), (True, None)),
+            (ValueError("bug"), (False, None)),
+        ]
+        
+        for error, expected in cases:
+            with self.subTest(error=repr(error)):
+                self.assertEqual(self.sched._classify_api_error(error), expected)
+
+
+class TestBindConflict(AdapterTestCase):
+    """Test cases for binds answered with 409 Conflict."""
+    
+    def _bind(self, uid="uid-1", node_name="node-1"):
+        """Create a bind action."""
+        return {"action": "bind", "pod_uid": uid, "pod_name": uid, "pod_namespace": "default",
+                "node_name": node_name, "plan_version": 1}
+    
+    def _conflict(self, observed_node):
+        """Make the next bind fail with 409 and the pod read back on observed_node."""
+        self.v1.create_namespaced_binding.side_effect = scheduler.ApiException(status=409)
+        self.v1.read_namespaced_pod.return_value = _v1_pod("uid-1", node_name=observed_node, phase="Running")
+    
+    def test_conflict_on_target_node_is_success(self):
+        """Test that a retried bind that had already succeeded is treated as success."""
+        self._conflict("node-1")
+        
+        result = self.sched._execute_bind(self._bind())
+        
+        self.assertTrue(result.success)
+        self.assertIsNone(result.observed_pod)
+    
+    def test_conflict_on_other_node_returns_observed_pod(self):
+        """Test that a pod found on another node is handed back for a targeted resync."""
+        self._conflict("node-2")
+        
+        result = self.sched._execute_bind(self._bind())
+        
+        self.assertFalse(result.success)
+        self.assertEqual(result.status, 409)
+        self.assertEqual(result.observed_pod, _pod("uid-1", node_name="node-2"))
+    
+    def test_conflict_resyncs_without_reinit_or_rebind(self):
+        """Test that a conflict with an unmanaged node neither re-initializes nor rebinds."""
+        self.sched.executor = mock.Mock()
+        self.sched._safe_reinitialize = mock.Mock()
+        bind = self.sched.logic.initialize(["node-1"], [_pod("uid-1")])["actions"][0]
+        self._conflict("node-9")
+        
+        for _ in range(2):
+            self.sched._handle_action_results([self.sched._execute_bind(bind)])
+        
+        self.sched._safe_reinitialize.assert_not_called()
+        self.sched.executor.submit.assert_not_called()
+        self.assertEqual(self.sched.logic.unmanaged_pods, {"uid-1": "node-9"})
+
+
+class TestListNodes(AdapterTestCase):
+    """Test cases for listing nodes and their pod slots."""
+    
+    def test_slots_are_computed_once_per_node(self):
+        """Test that schedulable and cordoned nodes report their slots, asking the model once each."""
+        self.sched.capacity_model = mock.Mock()
+        self.sched.capacity_model.slots.return_value = 4
+        self.v1.list_node.return_value = mock.Mock(
+            items=[_v1_node("node-1"), _v1_node("node-2", unschedulable=True)],
+            metadata=mock.Mock(resource_version="9")
+        )
+        
+        self.assertEqual(self.sched._list_nodes(), ({"node-1": 4, "node-2": 4}, ["node-2"]))
+        self.assertEqual(self.sched.node_slots, {"node-1": 4, "node-2": 0})
+        self.assertEqual(self.sched.node_resource_version, "9")
+        self.assertEqual(self.sched.capacity_model.slots.call_count, 2)
+
+
+class TestNodeWatch(AdapterTestCase):
+    """Test cases for turning node watch events into node lifecycle events."""
+    
+    def _run_node_watch(self, connections, known):
+        """
+        Run the node watch over scripted connections (event lists, or an exception to raise)
+        and return the reported events and the resourceVersion each connection started from.
+        """
+        requested = []
+        connections = list(connections)
+        
+        def stream(func, **kwargs):
+            requested.append(kwargs["resource_version"])
+            if not connections:
+                self.sched.state_generation += 1  # End the watch loop
+                return iter([])
+            connection = connections.pop(0)
+            if isinstance(connection, Exception):
+                raise connection
+            return iter(connection)
+        
+        self.sched.watch_retry_delay = 0
+        with mock.patch.object(scheduler.watch, "Watch") as watch:
+            watch.return_value.stream.side_effect = stream
+            self.sched._watch_nodes(self.sched.state_generation, "1", known)
+        
+        events = []
+        while not self.sched.event_queue.empty():
+            events.append(self.sched.event_queue.get_nowait()[2].to_dict())
+        return events, requested
+    
+    def test_cordon_uncordon_and_delete(self):
+        """Test that only transitions against the known node list are reported."""
+        known = {"node-1": 1, "node-2": 1}
+        events, requested = self._run_node_watch([[
+            {"type": "MODIFIED", "object": _v1_node("node-1", resource_version="2")},
+            {"type": "MODIFIED", "object": _v1_node("node-1", unschedulable=True, resource_version="3")},
+            {"type": "BOOKMARK", "object": {"kind": "Node", "metadata": {"resourceVersion": "4"}}},
+            {"type": "MODIFIED", "object": _v1_node("node-1", unschedulable=True, resource_version="5")},
+            {"type": "MODIFIED", "object": _v1_node("node-1", resource_version="6")},
+            {"type": "DELETED", "object": _v1_node("node-2", resource_version="7")},
+            {"type": "ADDED", "object": _v1_node("node-3", resource_version="8")},
+        ]], known)
+        
+        self.assertEqual([(e["event_type"], e["node_name"]) for e in events], [
+            ("NODE_CORDONED", "node-1"),
+            ("NODE_ADDED", "node-1"),
+            ("NODE_REMOVED", "node-2"),
+            ("NODE_ADDED", "node-3"),
+        ])
+        self.assertEqual(known, {"node-1": 1, "node-3": 1})
+        self.assertEqual(requested, ["1", "8"])
+    
+    def test_expired_watch_relists_and_reports_differences(self):
+        """Test that after a 410 the nodes are re-listed and the changes since reported."""
+        self.v1.list_node.return_value = mock.Mock(
+            items=[_v1_node("node-1", unschedulable=True), _v1_node("node-3")],
+            metadata=mock.Mock(resource_version="20")
+        )
+        events, requested = self._run_node_watch([scheduler.ApiException(status=410)],
+                                                 {"node-1": 1, "node-2": 1})
+        
+        self.assertEqual(sorted((e["event_type"], e["node_name"]) for e in events), [
+            ("NODE_ADDED", "node-3"),
+            ("NODE_CORDONED", "node-1"),
+            ("NODE_REMOVED", "node-2"),
+        ])
+        self.assertEqual(requested, ["1", "20"])
+
+
+class TestNextBatch(AdapterTestCase):
+    """Test cases for coalescing queued watch events into batches."""
+    
+    def test_batch_is_capped_at_max_size(self):
+        """Test that a backlog is handed out in batches of at most batch_max_size, in order."""
+        self.sched.batch_max_size = 3
+        for i in range(5):
+            self.sched.event_queue.put(i)
+        
+        self.assertEqual(self.sched._next_batch(), [0, 1, 2])
+        self.assertEqual(self.sched._next_batch(), [3, 4])
+    
+    def test_batch_collects_events_arriving_within_window(self):
+        """Test that events arriving before the window closes join the batch, later ones do not."""
+        self.sched.batch_max_delay = 0.5
+        self.sched.event_queue.put("first")
+        timer = threading.Timer(0.05, self.sched.event_queue.put, args=("second",))
+        timer.start()
+        
+        started = time.monotonic()
+        batch = self.sched._next_batch()
+        timer.join()
+        
+        self.assertEqual(batch, ["first", "second"])
+        self.assertGreaterEqual(time.monotonic() - started, 0.5)
+
+
+class TestListPods(AdapterTestCase):
+    """Test cases for the paginated pod LIST."""
+    
+    def test_list_filters_on_the_server(self):
+        """Test that the LIST asks the server for our non-terminal pods only."""
+        self.v1.list_pod_for_all_namespaces.return_value = _pod_list([_v1_pod("uid-1")])
+        
+        list(self.sched._list_pods())
+        
+        self.assertEqual(self.v1.list_pod_for_all_namespaces.call_args.kwargs["field_selector"],
+                         "spec.schedulerName=custom-scheduler,status.phase!=Succeeded,status.phase!=Failed")
+    
+    def test_watch_filters_on_the_server(self):
+        """Test that the pod watch uses the same server-side selector as the LIST."""
+        def stream(func, **kwargs):
+            self.sched.state_generation += 1  # End the watch loop after one connection
+            return iter([])
+        
+        with mock.patch.object(scheduler.watch, "Watch") as watch:
+            watch.return_value.stream.side_effect = stream
+            self.sched._watch_pods(self.sched.state_generation, "5")
+        
+        self.assertEqual(watch.return_value.stream.call_args.kwargs["field_selector"],
+                         self.sched.pod_field_selector)
+    
+    def test_list_keeps_client_side_checks(self):
+        """Test that pods the selector should have filtered are still dropped."""
+        self.v1.list_pod_for_all_namespaces.return_value = _pod_list([
+            _v1_pod("uid-1"),
+            _v1_pod("uid-2", scheduler_name="default-scheduler"),
+            _v1_pod("uid-3", phase="Succeeded"),
+        ])
+        
+        self.assertEqual([pod["uid"] for pod in self.sched._list_pods()], ["uid-1"])
+    
+    def test_list_streams_pages(self):
+        """Test that pages are fetched one at a time with the continue token of the previous one."""
+        pages = [
+            _pod_list([_v1_pod("uid-1"), _v1_pod("uid-2", node_name="node-1")], "10", "token-1"),
+            _pod_list([_v1_pod("uid-3")], "11", None),
+        ]
+        self.v1.list_pod_for_all_namespaces.side_effect = pages
+        self.sched.list_page_size = 2
+        
+        pods = self.sched._list_pods()
+        self.assertEqual(next(pods)["uid"], "uid-1")
+        self.assertEqual(self.v1.list_pod_for_all_namespaces.call_count, 1)
+        self.assertEqual([pod["uid"] for pod in pods], ["uid-2", "uid-3"])
+        
+        calls = self.v1.list_pod_for_all_namespaces.call_args_list
+        self.assertEqual([(c.kwargs["limit"], c.kwargs["_continue"]) for c in calls], [(2, None), (2, "token-1")])
+        
+        # The watch resumes from the version of the first page, which all pages are served from
+        self.assertEqual(self.sched.pod_resource_version, "10")
+    
+    def test_raw_page_releases_connection(self):
+        """Test that every raw page returns its connection to the pool, also on bad JSON."""
+        self.sched.raw_decode = True
+        good = mock.Mock(data=b'{"metadata": {"resourceVersion": "7"}, "items": []}')
+        bad = mock.Mock(data=b'{"items"')
+        self.v1.list_pod_for_all_namespaces.side_effect = [good, bad]
+        
+        self.assertEqual(self.sched._list_pod_page(None), ([], "7", None))
+        with self.assertRaises(ValueError):
+            self.sched._list_pod_page("token")
+        
+        good.release_conn.assert_called_once_with()
+        bad.release_conn.assert_called_once_with()
+
+
+class TestProcessBatch(AdapterTestCase):
+    """Test cases for turning a batch of queued watch events into logic calls."""
+    
+    def test_bookmark_advances_resource_version(self):
+        """Test that a bookmark moves the snapshot resourceVersion without calling the logic."""
+        self.sched.logic = mock.Mock()
+        bookmark = {"type": "BOOKMARK", "object": {"metadata": {"resourceVersion": "42"}}}
+        
+        self.sched._process_batch([(self.sched.state_generation, "42", bookmark)])
+        
+        self.assertEqual(self.sched.pod_resource_version, "42")
+        self.sched.logic.handle_events.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
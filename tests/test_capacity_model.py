@@ -0,0 +1,37 @@
+"""
+Unit tests for the node capacity models.
+"""
+
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scheduler'))
+
+from capacity_model import LabelSlotCapacity, SingleSlotCapacity
+
+
+class TestCapacityModels(unittest.TestCase):
+    """Test cases for SingleSlotCapacity and LabelSlotCapacity."""
+
+    def test_single_slot_ignores_metadata(self):
+        """Test that the default model always offers one slot."""
+        self.assertEqual(SingleSlotCapacity().slots({"custom-scheduler/slots": "8"}, None), 1)
+
+    def test_label_wins_over_annotation(self):
+        """Test that the label is read first, then the annotation, then the default."""
+        model = LabelSlotCapacity("custom-scheduler/slots", default_slots=2)
+
+        self.assertEqual(model.slots({"custom-scheduler/slots": "4"}, {"custom-scheduler/slots": "6"}), 4)
+        self.assertEqual(model.slots({}, {"custom-scheduler/slots": "6"}), 6)
+        self.assertEqual(model.slots(None, None), 2)
+
+    def test_invalid_values_use_default(self):
+        """Test that non-numeric and non-positive slot counts fall back to the default."""
+        model = LabelSlotCapacity("custom-scheduler/slots")
+
+        self.assertEqual(model.slots({"custom-scheduler/slots": "many"}, None), 1)
+        self.assertEqual(model.slots({"custom-scheduler/slots": "0"}, None), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
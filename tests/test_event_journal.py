@@ -0,0 +1,146 @@
+"""
+Unit tests for the event journal and the replay tool.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scheduler'))
+
+from event_journal import EventJournal, read_journal
+from replay import replay
+from scheduling_logic import SchedulingLogic
+
+
+def _pod(uid, priority=0, gang_name=None, node_name=None):
+    """Create a pod dictionary."""
+    return {
+        "uid": uid,
+        "name": uid,
+        "namespace": "default",
+        "priority": priority,
+        "gang_name": gang_name,
+        "node_name": node_name
+    }
+
+
+class TestEventJournal(unittest.TestCase):
+    """Test cases for EventJournal and read_journal."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "journal.jsonl")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_records_round_trip(self):
+        """Test that appended records are read back in order."""
+        journal = EventJournal(self.path)
+        journal.append({"op": "a", "n": 1})
+        journal.append({"op": "b", "n": 2})
+        journal.close()
+        
+        self.assertEqual(list(read_journal(self.path)), [{"op": "a", "n": 1}, {"op": "b", "n": 2}])
+    
+    def test_fsync_is_batched(self):
+        """Test that fsync happens once per batch, not once per record."""
+        journal = EventJournal(self.path, fsync_batch=10, fsync_interval=3600)
+        for i in range(25):
+            journal.append({"n": i})
+        
+        self.assertEqual(journal.syncs, 2)
+        journal.close()
+        self.assertEqual(journal.syncs, 3)
+    
+    def test_torn_last_record_is_skipped(self):
+        """Test that a partially written last line is ignored but earlier corruption raises."""
+        with open(self.path, "w") as f:
+            f.write('{"n": 1}\n{"n": 2}\n{"n"')
+        self.assertEqual(list(read_journal(self.path)), [{"n": 1}, {"n": 2}])
+        
+        with open(self.path, "w") as f:
+            f.write('{"n": 1}\n{"n"\n{"n": 3}\n')
+        with self.assertRaises(ValueError):
+            list(read_journal(self.path))
+
+
+class TestReplay(unittest.TestCase):
+    """Test cases for replaying a journal into SchedulingLogic."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "journal.jsonl")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def _record_session(self) -> SchedulingLogic:
+        """Run a short scheduling session with the journal enabled."""
+        journal = EventJournal(self.path)
+        logic = SchedulingLogic(journal=journal)
+        logic.initialize(["node-1", "node-2"], iter([_pod("uid-1", priority=10, node_name="node-1")]))
+        logic.handle_event({"event_type": "ADDED", "pod": _pod("uid-2", priority=20)})
+        logic.handle_events([
+            {"event_type": "ADDED", "pod": _pod("uid-g1", priority=50, gang_name="gang")},
+            {"event_type": "ADDED", "pod": _pod("uid-g2", priority=50, gang_name="gang")},
+        ])
+        logic.handle_event({"event_type": "DELETED", "pod": _pod("uid-1", priority=10)})
+        journal.close()
+        return logic
+    
+    def test_replay_reproduces_state_and_actions(self):
+        """Test that replaying a journal yields the same actions and final state."""
+        logic = self._record_session()
+        
+        report = replay(read_journal(self.path))
+        
+        self.assertEqual(report.calls, 4)
+        self.assertEqual(report.divergences, [])
+        self.assertEqual(report.logic.node_assignments, logic.node_assignments)
+        self.assertEqual(report.logic.all_pods, logic.all_pods)
+        self.assertEqual(sorted(report.latencies), ["handle_event", "handle_events", "initialize"])
+        self.assertEqual(len(report.latencies["handle_event"]), 2)
+    
+    def test_replay_until_offset(self):
+        """Test that replay can stop at an offset to rebuild intermediate state."""
+        self._record_session()
+        
+        report = replay(read_journal(self.path), until=2)
+        
+        self.assertEqual(report.calls, 2)
+        self.assertEqual(set(report.logic.all_pods), {"uid-1", "uid-2"})
+    
+    def test_keyword_arguments_are_journaled_and_replayed(self):
+        """Test that entry points accept keyword arguments with and without a journal."""
+        nodes = {"node-1": 1, "node-2": 1}
+        pods = [_pod("uid-1", node_name="node-1"), _pod("uid-2")]
+        plain = SchedulingLogic().initialize(nodes, pods, cordoned_nodes=["node-1"])
+        
+        journal = EventJournal(self.path)
+        logic = SchedulingLogic(journal=journal)
+        journaled = logic.initialize(nodes=nodes, existing_pods=iter(pods), cordoned_nodes=["node-1"])
+        journal.close()
+        
+        self.assertEqual(journaled["actions"], plain["actions"])
+        self.assertEqual(next(read_journal(self.path))["args"], [nodes, pods, ["node-1"]])
+        
+        report = replay(read_journal(self.path))
+        self.assertEqual(report.divergences, [])
+        self.assertEqual(report.logic.cordoned_slots, {"node-1"})
+    
+    def test_replay_detects_divergence(self):
+        """Test that actions differing from the recording are reported."""
+        records = [
+            {"op": "initialize", "args": [["node-1"], [_pod("uid-1")]]},
+            {"op": "actions", "actions": []},  # Replay binds uid-1
+        ]
+        
+        report = replay(records)
+        
+        self.assertEqual(report.divergences, [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
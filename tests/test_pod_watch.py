@@ -0,0 +1,74 @@
+"""
+Unit tests for the pod watch loop of the Kubernetes adapter (needs the kubernetes client).
+"""
+
+import queue
+import unittest
+import sys
+import os
+from unittest import mock
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scheduler'))
+
+try:
+    import scheduler
+except ImportError:
+    scheduler = None
+
+
+class FakeWatch:
+    """
+    Replays scripted connections. Like watch.Watch, it reconnects internally when the
+    server closes a connection, from self.resource_version if set, else the requested one.
+    """
+    
+    def __init__(self, owner, connections, requested):
+        self.owner = owner
+        self.connections = connections
+        self.requested = requested
+        self.resource_version = None
+    
+    def stop(self):
+        pass
+    
+    def stream(self, func, **kwargs):
+        for events in self.connections:
+            self.requested.append(self.resource_version or kwargs["resource_version"])
+            yield from events
+        
+        # End the watch loop once the script is done
+        self.owner.state_generation += 1
+
+
+@unittest.skipIf(scheduler is None, "kubernetes client not installed")
+class TestRawPodWatch(unittest.TestCase):
+    """Test cases for the raw-decoded pod watch."""
+    
+    def _raw_event(self, event_type, resource_version):
+        """Create a watch event carrying a raw JSON pod."""
+        return {"type": event_type, "object": {"metadata": {"resourceVersion": resource_version}}}
+    
+    def test_internal_reconnect_resumes_from_last_event(self):
+        """Test that the stream's internal reconnect does not replay events already seen."""
+        sched = object.__new__(scheduler.CustomScheduler)
+        sched.state_generation = 1
+        sched.raw_decode = True
+        sched.pod_field_selector = "spec.schedulerName=custom-scheduler"
+        sched.event_queue = queue.Queue()
+        sched.watch_retry_delay = 0
+        sched.v1 = mock.Mock()
+        
+        requested = []
+        connections = [
+            [self._raw_event("ADDED", "11"), self._raw_event("BOOKMARK", "12")],
+            [self._raw_event("MODIFIED", "13")],
+        ]
+        with mock.patch.object(scheduler.watch, "Watch",
+                               lambda: FakeWatch(sched, connections, requested)):
+            sched._watch_pods(1, "10")
+        
+        self.assertEqual(requested, ["10", "12"])
+        self.assertEqual([sched.event_queue.get_nowait()[1] for _ in range(3)], ["11", "12", "13"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Unit tests for the token-bucket rate limiter.
+"""
+
+import time
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scheduler'))
+
+from rate_limiter import TokenBucketRateLimiter
+
+
+class TestTokenBucketRateLimiter(unittest.TestCase):
+    """Test cases for TokenBucketRateLimiter."""
+    
+    def test_burst_is_not_throttled(self):
+        """Test that calls within the burst do not wait."""
+        limiter = TokenBucketRateLimiter(qps=1, burst=5)
+        
+        waits = [limiter.acquire() for _ in range(5)]
+        
+        self.assertEqual(waits, [0.0] * 5)
+        self.assertEqual(limiter.throttled_calls, 0)
+        self.assertEqual(limiter.total_calls, 5)
+    
+    def test_calls_beyond_burst_wait_for_refill(self):
+        """Test that calls past the burst are spaced at the configured QPS."""
+        limiter = TokenBucketRateLimiter(qps=50, burst=2)
+        
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        elapsed = time.monotonic() - start
+        
+        # 3 calls beyond the burst at 50 QPS need ~60ms
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertEqual(limiter.throttled_calls, 3)
+        self.assertGreater(limiter.total_wait_seconds, 0)
+    
+    def test_current_wait_time(self):
+        """Test that the current wait time reflects an empty bucket."""
+        limiter = TokenBucketRateLimiter(qps=10, burst=1)
+        self.assertEqual(limiter.current_wait_time(), 0.0)
+        
+        limiter.acquire()
+        
+        self.assertGreater(limiter.current_wait_time(), 0.05)
+        self.assertLessEqual(limiter.current_wait_time(), 0.1)
+    
+    def test_invalid_configuration(self):
+        """Test that nonsensical limits are rejected."""
+        with self.assertRaises(ValueError):
+            TokenBucketRateLimiter(qps=0, burst=1)
+        with self.assertRaises(ValueError):
+            TokenBucketRateLimiter(qps=1, burst=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Unit tests for the retry policy.
+"""
+
+import threading
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scheduler'))
+
+from retry_policy import RetryPolicy
+
+
+class FakeApiError(Exception):
+    """Stand-in for an API error carrying an HTTP status."""
+    
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"status {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def classify(error):
+    """Classify FakeApiError like the adapter classifies ApiException."""
+    if isinstance(error, FakeApiError):
+        return RetryPolicy.is_retryable_status(error.status), error.retry_after
+    return False, None
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for RetryPolicy."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.sleeps = []
+        self.policy = RetryPolicy(max_attempts=4, base_delay=0.1, max_delay=1.0,
+                                  sleep=self.sleeps.append, rng=lambda: 1.0)
+    
+    def _failing(self, errors, result="ok"):
+        """Operation that raises the given errors in turn, then returns result."""
+        errors = list(errors)
+        
+        def operation():
+            if errors:
+                raise errors.pop(0)
+            return result
+        return operation
+    
+    def test_transient_errors_are_retried(self):
+        """Test that 503/429 are retried with growing delays until success."""
+        result = self.policy.call(self._failing([FakeApiError(503), FakeApiError(429)]), classify)
+        
+        self.assertEqual(result, "ok")
+        self.assertEqual(self.sleeps, [0.2, 0.4])
+        self.assertEqual(self.policy.retries, 2)
+    
+    def test_non_transient_error_is_raised_immediately(self):
+        """Test that a 403 is not retried."""
+        with self.assertRaises(FakeApiError):
+            self.policy.call(self._failing([FakeApiError(403)]), classify)
+        self.assertEqual(self.sleeps, [])
+    
+    def test_retry_after_is_honored(self):
+        """Test that the server's Retry-After overrides a shorter backoff."""
+        self.policy.call(self._failing([FakeApiError(429, retry_after=0.75)]), classify)
+        self.assertEqual(self.sleeps, [0.75])
+    
+    def test_gives_up_after_max_attempts(self):
+        """Test that retries stop after the attempt budget and the error propagates."""
+        with self.assertRaises(FakeApiError):
+            self.policy.call(self._failing([FakeApiError(500)] * 10), classify)
+        
+        self.assertEqual(len(self.sleeps), 3)
+        self.assertEqual(self.policy.exhausted, 1)
+    
+    def test_counters_are_exact_across_threads(self):
+        """Test that concurrent calls from executor threads do not lose counter updates."""
+        policy = RetryPolicy(max_attempts=2, sleep=lambda delay: None, rng=lambda: 0.0)
+        
+        def worker():
+            for _ in range(500):
+                with self.assertRaises(FakeApiError):
+                    policy.call(self._failing([FakeApiError(500)] * 2), classify)
+        
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+        
+        self.assertEqual(policy.retries, 4000)
+        self.assertEqual(policy.exhausted, 4000)
+    
+    def test_backoff_is_capped_and_jittered(self):
+        """Test that backoff never exceeds max_delay and scales with the jitter source."""
+        policy = RetryPolicy(base_delay=0.1, max_delay=1.0, rng=lambda: 0.5)
+        self.assertAlmostEqual(policy.backoff(1), 0.1)
+        self.assertAlmostEqual(policy.backoff(10), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,9 @@
 Unit tests for the custom scheduler logic (pure Python, no K8s mocking).
 """
 
+import copy
+import json
+import random
 import unittest
 import sys
 import os
@@ -10,12 +13,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scheduler'))
 from scheduling_logic import SchedulingLogic, PodInfo
 
 
-class TestSchedulingLogic(unittest.TestCase):
-    """Test cases for SchedulingLogic (pure Python)."""
-    
-    def setUp(self):
-        """Set up test fixtures."""
-        self.logic = SchedulingLogic()
+class PodFixtures:
+    """Mixin with the pod dict factory shared by the test cases."""
     
     def _create_pod_dict(self, uid, name, namespace="default", priority=0, 
                          gang_name=None, node_name=None):
@@ -28,6 +27,14 @@ class TestSchedulingLogic(unittest.TestCase):
             "gang_name": gang_name,
             "node_name": node_name
         }
+
+
+class TestSchedulingLogic(PodFixtures, unittest.TestCase):
+    """Test cases for SchedulingLogic (pure Python)."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.logic = SchedulingLogic()
     
     def test_initialize_empty_cluster(self):
         """Test initializing with no existing pods."""
@@ -67,6 +74,20 @@ class TestSchedulingLogic(unittest.TestCase):
         self.assertEqual(result["actions"][0]["action"], "bind")
         self.assertEqual(result["actions"][0]["pod_uid"], "uid-1")
     
+    def test_initialize_from_generator(self):
+        """Test initializing from a generator that streams pods page by page."""
+        nodes = ["node-1", "node-2", "node-3"]
+        pages = [
+            [self._create_pod_dict("uid-1", "pod-1", priority=50, node_name="node-1")],
+            [self._create_pod_dict("uid-2", "pod-2", priority=30)],
+        ]
+        
+        result = self.logic.initialize(nodes, (pod for page in pages for pod in page))
+        
+        self.assertEqual(len(self.logic.all_pods), 2)
+        self.assertEqual(self.logic.node_assignments["node-1"], "uid-1")
+        self.assertEqual([a["pod_uid"] for a in result["actions"]], ["uid-2"])
+    
     def test_add_pod_event(self):
         """Test handling ADDED event for a pod."""
         self.logic.initialize(["node-1", "node-2"], [])
@@ -496,25 +517,1058 @@ class TestSchedulingLogic(unittest.TestCase):
         gang_2 = next(p for p in gang_pods if p.uid == "gang-2")
         self.assertFalse(gang_2.waiting_on_deletion, "gang-2 was never scheduled, doesn't need deletion")
 
+    
+    def test_reverse_assignment_index_consistent(self):
+        """Test that pod->node lookups stay in sync with node_assignments."""
+        nodes = ["node-1", "node-2"]
+        existing_pods = [
+            self._create_pod_dict("uid-low", "low-pod", priority=10, node_name="node-1")
+        ]
+        self.logic.initialize(nodes, existing_pods)
+        self.assertEqual(self.logic.pod_nodes, {"uid-low": "node-1"})
+        
+        # Two higher priority pods arrive: low is preempted, both bind
+        for uid in ["uid-a", "uid-b"]:
+            self.logic.handle_event({
+                "event_type": "ADDED",
+                "pod": self._create_pod_dict(uid, uid, priority=100)
+            })
+        
+        expected = {uid: node for node, uid in self.logic.node_assignments.items() if uid}
+        self.assertEqual(self.logic.pod_nodes, expected)
+        self.assertNotIn("uid-low", self.logic.pod_nodes)
+        
+        # Deleting a bound pod frees its node through the reverse index
+        node_a = self.logic.pod_nodes["uid-a"]
+        self.logic.handle_event({
+            "event_type": "DELETED",
+            "pod": self._create_pod_dict("uid-a", "uid-a", priority=100, node_name=node_a)
+        })
+        self.assertNotIn("uid-a", self.logic.pod_nodes)
+        self.assertIsNone(self.logic.node_assignments[node_a])
+    
+    def test_added_pod_on_new_node_releases_previous_node(self):
+        """Test that a pod observed on a different node does not occupy two nodes."""
+        self.logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1")
+        ])
+        
+        self.logic.handle_event({
+            "event_type": "ADDED",
+            "pod": self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-2")
+        })
+        
+        self.assertIsNone(self.logic.node_assignments["node-1"])
+        self.assertEqual(self.logic.node_assignments["node-2"], "uid-1")
+        self.assertEqual(self.logic.pod_nodes, {"uid-1": "node-2"})
+    
+    def test_binds_take_lowest_free_node(self):
+        """Test that binds use free nodes in name order, including nodes freed later."""
+        self.logic.initialize(["node-c", "node-a", "node-b", "node-d"], [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-a"),
+            self._create_pod_dict("uid-2", "pod-2", priority=10, node_name="node-c"),
+        ])
+        
+        result = self.logic.handle_event({"event_type": "ADDED", "pod": self._create_pod_dict("uid-3", "pod-3")})
+        self.assertEqual(result["actions"][0]["node_name"], "node-b")
+        
+        self.logic.handle_event({"event_type": "DELETED", "pod": self._create_pod_dict("uid-1", "pod-1", priority=10)})
+        result = self.logic.handle_events([
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-4", "pod-4")},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-5", "pod-5")},
+        ])
+        self.assertEqual([a["node_name"] for a in result["actions"]], ["node-a", "node-d"])
+        
+        # Lazy deletion never lets the heap grow beyond the node count
+        self.assertLessEqual(len(self.logic._free_heap), len(self.logic.node_assignments))
+    
+    def test_dump_state(self):
+        """Test that dump_state renders assignments, queue and waiting pods on demand."""
+        self.logic.initialize(["node-1"], [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1")
+        ])
+        self.logic.handle_event({"event_type": "ADDED", "pod": self._create_pod_dict("uid-2", "pod-2", priority=100)})
+        
+        dump = self.logic.dump_state()
+        
+        self.assertIn("node-1: default/pod-2 (uid-2)", dump)
+        self.assertIn("priority=100 size=1 default/pod-2", dump)
+        self.assertIn("Waiting on deletion: default/pod-1", dump)
 
-class TestSchedulingIntegration(unittest.TestCase):
-    """Integration tests for complex scheduling scenarios."""
+
+class TestIncrementalSchedulingQueue(PodFixtures, unittest.TestCase):
+    """Test cases for the incrementally maintained scheduling queue."""
     
     def setUp(self):
         """Set up test fixtures."""
         self.logic = SchedulingLogic()
     
-    def _create_pod_dict(self, uid, name, namespace="default", priority=0, 
-                         gang_name=None, node_name=None):
-        """Create a pod dictionary."""
-        return {
-            "uid": uid,
-            "name": name,
-            "namespace": namespace,
-            "priority": priority,
-            "gang_name": gang_name,
-            "node_name": node_name
-        }
+    def _queue_snapshot(self):
+        """Describe the queue as (gang_name or pod uid, priority, size) tuples."""
+        return [(u.gang_name or u.pods[0].uid, u.effective_priority, u.required_nodes)
+                for u in self.logic.scheduling_queue]
+    
+    def test_queue_ordered_by_priority_then_size(self):
+        """Test that the queue stays sorted as units arrive in arbitrary order."""
+        self.logic.initialize([f"node-{i}" for i in range(1, 6)], [])
+        
+        events = [
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-low", "low", priority=10)},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-g1", "g1", priority=50, gang_name="gang")},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-high", "high", priority=100)},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-g2", "g2", priority=50, gang_name="gang")},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-mid", "mid", priority=50)},
+        ]
+        for event in events:
+            self.logic.handle_event(event)
+        
+        self.assertEqual(self._queue_snapshot(), [
+            ("uid-high", 100, 1),
+            ("uid-mid", 50, 1),
+            ("gang", 50, 2),
+            ("uid-low", 10, 1),
+        ])
+    
+    def test_queue_matches_full_rebuild(self):
+        """Test that incremental updates produce the same queue order as a full rebuild, ties included."""
+        self.logic.initialize([], [])
+        
+        def added(uid, priority, gang_name=None):
+            return {"event_type": "ADDED", "pod": self._create_pod_dict(uid, uid, priority=priority, gang_name=gang_name)}
+        
+        def deleted(uid, priority, gang_name=None):
+            return {"event_type": "DELETED", "pod": self._create_pod_dict(uid, uid, priority=priority, gang_name=gang_name)}
+        
+        events = [
+            added("uid-1", 10),
+            added("uid-a1", 40, "gang-a"),
+            added("uid-b1", 40, "gang-b"),
+            added("uid-b2", 40, "gang-b"),
+            added("uid-2", 90),
+            added("uid-a2", 40, "gang-a"),  # gang-a arrived first, so it ties ahead of gang-b
+            added("uid-5", 40),
+            deleted("uid-1", 10),
+            added("uid-3", 30),
+            added("uid-4", 30),
+            added("uid-a3", 20, "gang-a"),
+            deleted("uid-a3", 20, "gang-a"),  # Back to its old bucket, still ahead of gang-b
+            deleted("uid-a1", 40, "gang-a"),  # Down to uid-a2, which arrived before uid-5
+            added("uid-a4", 40, "gang-a"),  # Its earliest pod is now uid-a2, after gang-b's
+            added("uid-1", 10),
+        ]
+        for event in events:
+            self.logic.handle_event(event)
+            incremental = self._queue_snapshot()
+            
+            rebuilt = copy.deepcopy(self.logic)
+            rebuilt._rebuild_scheduling_queue()
+            
+            self.assertEqual(incremental,
+                             [(u.gang_name or u.pods[0].uid, u.effective_priority, u.required_nodes)
+                              for u in rebuilt.scheduling_queue])
+        
+        self.assertEqual([unit for unit, _, _ in incremental],
+                         ["uid-2", "uid-5", "gang-b", "gang-a", "uid-3", "uid-4", "uid-1"])
+    
+    def test_preempted_pod_leaves_queue_until_readded(self):
+        """Test that preempted pods are dropped from the queue and return when re-added."""
+        self.logic.initialize(["node-1"], [
+            self._create_pod_dict("uid-low", "low", priority=10, node_name="node-1")
+        ])
+        
+        self.logic.handle_event({
+            "event_type": "ADDED",
+            "pod": self._create_pod_dict("uid-high", "high", priority=100)
+        })
+        self.assertEqual(self._queue_snapshot(), [("uid-high", 100, 1)])
+        
+        # Controller deletes and recreates the preempted pod
+        self.logic.handle_event({
+            "event_type": "DELETED",
+            "pod": self._create_pod_dict("uid-low", "low", priority=10, node_name="node-1")
+        })
+        self.logic.handle_event({
+            "event_type": "ADDED",
+            "pod": self._create_pod_dict("uid-low-2", "low", priority=10)
+        })
+        self.assertEqual(self._queue_snapshot(), [("uid-high", 100, 1), ("uid-low-2", 10, 1)])
+
+    
+    def test_gang_index_tracks_min_priority(self):
+        """Test that the gang index keeps the running min priority as members come and go."""
+        self.logic.initialize([f"node-{i}" for i in range(1, 5)], [])
+        
+        for uid, priority in [("uid-g1", 50), ("uid-g2", 20), ("uid-g3", 40)]:
+            self.logic.handle_event({
+                "event_type": "ADDED",
+                "pod": self._create_pod_dict(uid, uid, priority=priority, gang_name="gang")
+            })
+        
+        entry = self.logic.gang_members["gang"]
+        self.assertEqual(set(entry.members), {"uid-g1", "uid-g2", "uid-g3"})
+        self.assertEqual(entry.min_priority, 20)
+        self.assertEqual(entry.unit.effective_priority, 20)
+        
+        # Removing the minimum member recomputes the gang priority
+        self.logic.handle_event({
+            "event_type": "DELETED",
+            "pod": self._create_pod_dict("uid-g2", "uid-g2", priority=20, gang_name="gang")
+        })
+        self.assertEqual(entry.min_priority, 40)
+        self.assertEqual(entry.unit.effective_priority, 40)
+        self.assertEqual(entry.unit.required_nodes, 2)
+    
+    def test_plan_matches_linear_greedy_scan(self):
+        """Test that the capacity tree admits the same units as a unit-by-unit greedy scan."""
+        rng = random.Random(5)
+        pods = []
+        for i in range(300):
+            if i < 200:
+                # Gangs of 2-4 pods on few priorities, so buckets hold several units
+                gang_size = 2 + (i // 40)
+                gang, priority = f"gang-{gang_size}-{i // gang_size}", (i // gang_size) % 3
+            else:
+                gang, priority = None, rng.randrange(4)
+            pods.append(self._create_pod_dict(f"uid-{i}", f"pod-{i}", priority=priority, gang_name=gang))
+        rng.shuffle(pods)
+        
+        for num_nodes in range(1, 160, 6):
+            self.logic = SchedulingLogic()
+            self.logic.initialize([f"node-{i}" for i in range(num_nodes)], [dict(p) for p in pods])
+            
+            for deleted in pods[:150:10] + [None]:
+                if deleted is not None:
+                    self.logic.handle_event({"event_type": "DELETED", "pod": deleted})
+                
+                expected, remaining = [], num_nodes
+                for unit in self.logic.scheduling_queue:
+                    if unit.required_nodes <= remaining:
+                        expected.append(unit)
+                        remaining -= unit.required_nodes
+                
+                self.assertEqual([id(u) for u in self.logic._create_scheduling_plan()],
+                                 [id(u) for u in expected], f"{num_nodes} nodes")
+    
+    def test_gang_index_waiting_count_through_reformation(self):
+        """Test that the waiting-on-deletion count drives gang reformation."""
+        self.logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-g1", "g1", priority=10, gang_name="gang", node_name="node-1"),
+            self._create_pod_dict("uid-g2", "g2", priority=10, gang_name="gang", node_name="node-2"),
+        ])
+        
+        # A higher priority pod preempts the whole gang
+        self.logic.handle_event({
+            "event_type": "ADDED",
+            "pod": self._create_pod_dict("uid-high", "high", priority=100)
+        })
+        entry = self.logic.gang_members["gang"]
+        self.assertEqual(entry.waiting_count, 2)
+        self.assertIn("gang", self.logic.gangs_in_transition)
+        
+        # Members are deleted and recreated by their controller
+        for uid, node in [("uid-g1", "node-1"), ("uid-g2", "node-2")]:
+            self.logic.handle_event({
+                "event_type": "DELETED",
+                "pod": self._create_pod_dict(uid, uid, priority=10, gang_name="gang", node_name=node)
+            })
+        self.assertNotIn("gang", self.logic.gang_members)
+        
+        self.logic.handle_event({
+            "event_type": "ADDED",
+            "pod": self._create_pod_dict("uid-g3", "g1", priority=10, gang_name="gang")
+        })
+        self.assertNotIn("gang", self.logic.gangs_in_transition)
+        self.assertEqual(self.logic.gang_members["gang"].waiting_count, 0)
+
+
+class TestBucketedQueue(PodFixtures, unittest.TestCase):
+    """Test cases for the (priority, size) buckets behind the scheduling queue."""
+    
+    def setUp(self):
+        """Set up test fixtures: no nodes, so every unit stays queued."""
+        self.logic = SchedulingLogic()
+        self.logic.initialize([], [])
+    
+    def _add(self, uid, priority, gang_name=None):
+        """Send an ADDED event for a pending pod."""
+        self.logic.handle_event({"event_type": "ADDED",
+                                 "pod": self._create_pod_dict(uid, uid, priority=priority, gang_name=gang_name)})
+    
+    def _delete(self, uid, priority, gang_name=None):
+        """Send a DELETED event for a pod."""
+        self.logic.handle_event({"event_type": "DELETED",
+                                 "pod": self._create_pod_dict(uid, uid, priority=priority, gang_name=gang_name)})
+    
+    def _bucket(self, priority, size):
+        """Unit ids in one bucket, in bucket order."""
+        return [unit.gang_name or unit.pods[0].uid for unit in self.logic._buckets[(-priority, size)].values()]
+    
+    def test_bucket_is_fifo(self):
+        """Test that units of equal priority and size keep arrival order, also when re-added."""
+        for uid in ["uid-1", "uid-2", "uid-3"]:
+            self._add(uid, 10)
+        self.assertEqual(self._bucket(10, 1), ["uid-1", "uid-2", "uid-3"])
+    
+        # A re-added pod goes to the back of its bucket
+        self._delete("uid-1", 10)
+        self._add("uid-1", 10)
+        self.assertEqual(self._bucket(10, 1), ["uid-2", "uid-3", "uid-1"])
+        self.assertEqual([unit.pods[0].uid for unit in self.logic.scheduling_queue], ["uid-2", "uid-3", "uid-1"])
+    
+    def test_empty_bucket_is_removed(self):
+        """Test that a bucket and its key disappear with its last unit."""
+        self._add("uid-1", 10)
+        self._add("uid-2", 50)
+        self.assertEqual(self.logic._bucket_keys, [(-50, 1), (-10, 1)])
+    
+        self._delete("uid-2", 50)
+    
+        self.assertEqual(self.logic._bucket_keys, [(-10, 1)])
+        self.assertEqual(list(self.logic._buckets), [(-10, 1)])
+    
+    def test_gang_moves_between_buckets(self):
+        """Test that a gang changes bucket when its size or minimum priority changes."""
+        self._add("uid-g1", 50, "gang")
+        self._add("uid-g2", 50, "gang")
+        self.assertEqual(self._bucket(50, 2), ["gang"])
+    
+        # A third member grows the gang into the size-3 bucket
+        self._add("uid-g3", 50, "gang")
+        self.assertEqual(self._bucket(50, 3), ["gang"])
+        self.assertNotIn((-50, 2), self.logic._buckets)
+    
+        # A lower-priority member moves it to a lower-priority bucket
+        self._add("uid-g4", 20, "gang")
+        self.assertEqual(self.logic._bucket_keys, [(-20, 4)])
+    
+        # Deleting that member moves it back
+        self._delete("uid-g4", 20, "gang")
+        self.assertEqual(self.logic._bucket_keys, [(-50, 3)])
+        self.assertEqual(self.logic.gang_members["gang"].unit.queue_key[:2], (-50, 3))
+
+
+class TestBatchedEvents(PodFixtures, unittest.TestCase):
+    """Test cases for SchedulingLogic.handle_events (one plan per batch)."""
+    
+    def test_batch_matches_sequential_state(self):
+        """Test that a batch ends in the same state as processing events one by one."""
+        nodes = [f"node-{i}" for i in range(1, 6)]
+        events = [
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-g1", "g1", priority=50, gang_name="gang")},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-g2", "g2", priority=50, gang_name="gang")},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-g3", "g3", priority=50, gang_name="gang")},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-1", "pod-1", priority=10)},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-2", "pod-2", priority=20)},
+        ]
+        
+        sequential = SchedulingLogic()
+        sequential.initialize(nodes, [])
+        for event in events:
+            sequential.handle_event(event)
+        
+        batched = SchedulingLogic()
+        batched.initialize(nodes, [])
+        result = batched.handle_events(events)
+        
+        self.assertEqual(len(result["actions"]), 5)
+        self.assertTrue(all(a["action"] == "bind" for a in result["actions"]))
+        self.assertEqual(set(batched.pod_nodes), set(sequential.pod_nodes))
+        self.assertEqual(set(batched.all_pods), set(sequential.all_pods))
+    
+    def test_batch_skips_intermediate_churn(self):
+        """Test that a batch does not bind pods that a later event would preempt."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1"], [])
+        
+        result = logic.handle_events([
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-low", "low", priority=10)},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-high", "high", priority=100)},
+        ])
+        
+        self.assertEqual(result["actions"], [{
+            "action": "bind",
+            "pod_uid": "uid-high",
+            "pod_name": "high",
+            "pod_namespace": "default",
+            "node_name": "node-1",
+            "plan_version": result["plan_version"]
+        }])
+        self.assertFalse(logic.all_pods["uid-low"].waiting_on_deletion)
+    
+    def test_empty_batch_has_no_actions(self):
+        """Test that an empty batch does not plan."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1"], [])
+        
+        self.assertEqual(logic.handle_events([])["actions"], [])
+    
+    def test_bind_not_found_result_frees_node(self):
+        """Test that a bind failing with 404 forgets the pod and reuses its node."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1"], [])
+        
+        result = logic.handle_events([
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-high", "high", priority=100)},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-low", "low", priority=10)},
+        ])
+        bind = result["actions"][0]
+        self.assertEqual(bind["pod_uid"], "uid-high")
+        
+        follow_up = logic.handle_action_results([{"action": bind, "success": False, "status": 404}])
+        
+        self.assertNotIn("uid-high", logic.all_pods)
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in follow_up["actions"]],
+                         [("bind", "uid-low", "node-1")])
+    
+    def test_failed_bind_result_is_replanned_in_same_call(self):
+        """Test that a bind failing for another reason is reverted and planned again right away."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-2", "pod-2", priority=5, node_name="node-2")
+        ])
+        
+        bind = logic.handle_event({
+            "event_type": "ADDED",
+            "pod": self._create_pod_dict("uid-1", "pod-1", priority=10)
+        })["actions"][0]
+        
+        follow_up = logic.handle_action_results([
+            {"action": bind, "success": False, "status": 500}
+        ])
+        
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in follow_up["actions"]],
+                         [("bind", "uid-1", "node-1")])
+        self.assertGreater(follow_up["plan_version"], bind["plan_version"])
+        self.assertEqual(logic.pod_nodes, {"uid-1": "node-1", "uid-2": "node-2"})
+    
+    def test_bind_conflict_result_resyncs_pod(self):
+        """Test that a bind conflict moves only the conflicting pod to its observed node."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-2", "pod-2", priority=5, node_name="node-2")
+        ])
+        
+        bind = logic.handle_event({
+            "event_type": "ADDED",
+            "pod": self._create_pod_dict("uid-1", "pod-1", priority=10)
+        })["actions"][0]
+        self.assertEqual(bind["node_name"], "node-1")
+        
+        follow_up = logic.handle_action_results([{
+            "action": bind, "success": False, "status": 409,
+            "observed_pod": self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-2")
+        }])
+        
+        # Pod-1 really runs on node-2, so the pod we assumed there is evicted
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in follow_up["actions"]],
+                         [("preempt", "uid-2", "node-2")])
+        self.assertEqual(logic.pod_nodes["uid-1"], "node-2")
+        self.assertEqual(logic.node_assignments["node-2"], "uid-1")
+        self.assertIsNone(logic.node_assignments["node-1"])
+        self.assertNotIn("uid-2", logic.pod_nodes)
+        self.assertTrue(logic.all_pods["uid-2"].waiting_on_deletion)
+    
+    def test_resync_pod_unbound_frees_node(self):
+        """Test that resyncing a pod observed without a node frees its assumed node."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1"], [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1")
+        ])
+        
+        # Still pending in the cluster, so it is bound again to the freed node
+        result = logic.resync_pod(self._create_pod_dict("uid-1", "pod-1", priority=10))
+        
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in result["actions"]],
+                         [("bind", "uid-1", "node-1")])
+    
+    def test_bind_conflict_on_unmanaged_node_is_not_rebound(self):
+        """Test that a pod observed on an unmanaged node leaves planning instead of being rebound."""
+        logic = SchedulingLogic()
+        bind = logic.initialize(["node-2"], [
+            self._create_pod_dict("uid-1", "pod-1", priority=10)
+        ])["actions"][0]
+        self.assertEqual(bind["node_name"], "node-2")
+        
+        observed = self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="other-node")
+        for _ in range(3):
+            result = logic.handle_action_results([{
+                "action": bind, "success": False, "status": 409, "observed_pod": observed
+            }])
+            self.assertEqual(result["actions"], [])
+        
+        self.assertEqual(logic.unmanaged_pods, {"uid-1": "other-node"})
+        self.assertIsNone(logic.node_assignments["node-2"])
+        
+        # The freed node is still used by other pods, and deleting the pod forgets it
+        result = logic.handle_events([
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-2", "pod-2", priority=5)},
+            {"event_type": "DELETED", "pod": observed},
+        ])
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in result["actions"]],
+                         [("bind", "uid-2", "node-2")])
+        self.assertEqual(logic.unmanaged_pods, {})
+
+class TestPlanShortCircuit(PodFixtures, unittest.TestCase):
+    """Test cases for skipping replans on plan-neutral events."""
+    
+    def _full_cluster(self):
+        """Two nodes running priority-50 pods."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-1", "pod-1", priority=50, node_name="node-1"),
+            self._create_pod_dict("uid-2", "pod-2", priority=50, node_name="node-2"),
+        ])
+        return logic
+    
+    def test_low_priority_pod_on_full_cluster_is_skipped(self):
+        """Test that a pod below the cutoff on a full cluster does not trigger a replan."""
+        logic = self._full_cluster()
+        version = logic.plan_version
+        
+        result = logic.handle_event({"event_type": "ADDED", "pod": self._create_pod_dict("uid-3", "pod-3", priority=10)})
+        
+        self.assertEqual(result["actions"], [])
+        self.assertEqual(logic.plan_version, version)
+        self.assertEqual(logic.skipped_replans, 1)
+        
+        # Deleting the pending pod again is plan-neutral as well
+        logic.handle_event({"event_type": "DELETED", "pod": self._create_pod_dict("uid-3", "pod-3", priority=10)})
+        self.assertEqual(logic.skipped_replans, 2)
+    
+    def test_pod_above_cutoff_replans(self):
+        """Test that a pod that outranks an admitted unit is planned and preempts."""
+        logic = self._full_cluster()
+        
+        result = logic.handle_event({"event_type": "ADDED", "pod": self._create_pod_dict("uid-3", "pod-3", priority=100)})
+        
+        self.assertEqual([a["action"] for a in result["actions"]], ["preempt", "bind"])
+        self.assertEqual(logic.skipped_replans, 0)
+    
+    def test_freed_capacity_replans(self):
+        """Test that deleting a running pod lets a skipped pending pod in."""
+        logic = self._full_cluster()
+        logic.handle_event({"event_type": "ADDED", "pod": self._create_pod_dict("uid-3", "pod-3", priority=10)})
+        
+        result = logic.handle_event({"event_type": "DELETED", "pod": self._create_pod_dict("uid-1", "pod-1", priority=50)})
+        
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in result["actions"]],
+                         [("bind", "uid-3", "node-1")])
+    
+    def test_growing_admitted_gang_replans(self):
+        """Test that a change to an admitted unit is never treated as plan-neutral."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-g1", "g1", priority=50, gang_name="gang", node_name="node-1"),
+            self._create_pod_dict("uid-g2", "g2", priority=50, gang_name="gang", node_name="node-2"),
+        ])
+        
+        # The gang no longer fits, so its running members are preempted
+        result = logic.handle_event({"event_type": "ADDED",
+                                     "pod": self._create_pod_dict("uid-g3", "g3", priority=50, gang_name="gang")})
+        
+        self.assertEqual(sorted(a["action"] for a in result["actions"]), ["preempt", "preempt"])
+        self.assertEqual(logic.skipped_replans, 0)
+    
+    def test_matches_always_replanning(self):
+        """Test that skipping replans never changes the produced actions, also with node events."""
+        class AlwaysReplan(SchedulingLogic):
+            def _replan(self):
+                self._plan_dirty = True
+                return super()._replan()
+        
+        skipped = 0
+        for seed in range(40):
+            with self.subTest(seed=seed):
+                logic, reference = SchedulingLogic(), AlwaysReplan()
+                self._run_random_events(random.Random(seed), logic, reference)
+                self.assertLess(logic.plans_computed, reference.plans_computed)
+                self.assertEqual(logic.plan_version, reference.plan_version)
+                skipped += logic.skipped_replans
+        self.assertGreater(skipped, 0)
+    
+    def _run_random_events(self, rng, logic, reference, steps=300):
+        """Feed the same random pod and node events to both logics and compare every result."""
+        nodes = [f"node-{i}" for i in range(6)]
+        self.assertEqual(logic.initialize(nodes, []), reference.initialize(nodes, []))
+        
+        def apply(event, i):
+            expected = reference.handle_event(event)
+            self.assertEqual(logic.handle_event(event), expected, f"event {i}: {event}")
+            return expected
+        
+        live = {}
+        for i in range(steps):
+            roll = rng.random()
+            if roll < 0.1:
+                node = rng.choice(nodes) if rng.random() < 0.5 else f"node-{len(nodes)}"
+                if node not in nodes:
+                    nodes.append(node)
+                event = {"event_type": "NODE_ADDED", "node_name": node}
+            elif roll < 0.25:
+                event = {"event_type": "NODE_CORDONED", "node_name": rng.choice(nodes)}
+            elif roll < 0.27:
+                event = {"event_type": "NODE_REMOVED", "node_name": rng.choice(nodes)}
+            elif live and roll < 0.5:
+                pod = live.pop(rng.choice(sorted(live)))
+                event = {"event_type": "DELETED", "pod": pod}
+            else:
+                gang = f"gang-{rng.randrange(3)}" if rng.random() < 0.3 else None
+                pod = self._create_pod_dict(f"uid-{i}", f"pod-{i}", priority=rng.randrange(6), gang_name=gang)
+                live[pod["uid"]] = pod
+                event = {"event_type": "ADDED", "pod": pod}
+            
+            expected = apply(event, i)
+            
+            # Preempted pods and pods of removed nodes go away, as the cluster would delete them
+            gone = {a["pod_uid"] for a in expected["actions"] if a["action"] == "preempt"}
+            gone.update(uid for uid in live if uid not in logic.pod_nodes and logic.all_pods[uid].waiting_on_deletion)
+            for uid in sorted(gone & set(live)):
+                apply({"event_type": "DELETED", "pod": live.pop(uid)}, i)
+            self.assertEqual(logic.node_assignments, reference.node_assignments)
+
+
+class TestPlanVersioning(PodFixtures, unittest.TestCase):
+    """Test cases for plan versions and plan deltas."""
+    
+    def test_versions_increase_and_tag_actions(self):
+        """Test that each changed plan gets a new version that its actions carry."""
+        logic = SchedulingLogic()
+        first = logic.initialize(["node-1", "node-2"], [self._create_pod_dict("uid-1", "pod-1", priority=10)])
+        second = logic.handle_event({"event_type": "ADDED",
+                                     "pod": self._create_pod_dict("uid-2", "pod-2", priority=10)})
+        
+        self.assertEqual(first["plan_version"], 1)
+        self.assertEqual(second["plan_version"], 2)
+        self.assertEqual([a["plan_version"] for a in first["actions"] + second["actions"]], [1, 2])
+        self.assertEqual(second["delta"], {
+            "admitted": [{"gang_name": None, "pod_uids": ["uid-2"]}],
+            "evicted": [],
+            "moved": []
+        })
+    
+    def test_unchanged_plan_keeps_version(self):
+        """Test that a replan that changes nothing keeps the version and has an empty delta."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1"], [self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1")])
+        
+        # Resyncing a pod onto the node it already has forces a plan that changes nothing
+        plans = logic.plans_computed
+        result = logic.resync_pod(self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1"))
+        
+        self.assertEqual(logic.plans_computed, plans + 1)
+        self.assertEqual(result, {"actions": [], "plan_version": 1,
+                                  "delta": {"admitted": [], "evicted": [], "moved": []}})
+    
+    def test_preemption_delta_reports_evicted_gang(self):
+        """Test that a preempted gang is reported as evicted and its replacement as admitted."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-g1", "g1", priority=10, gang_name="gang", node_name="node-1"),
+            self._create_pod_dict("uid-g2", "g2", priority=10, gang_name="gang", node_name="node-2"),
+        ])
+        
+        result = logic.handle_event({"event_type": "ADDED",
+                                     "pod": self._create_pod_dict("uid-3", "pod-3", priority=100)})
+        
+        self.assertEqual(result["delta"]["admitted"], [{"gang_name": None, "pod_uids": ["uid-3"]}])
+        self.assertEqual(result["delta"]["evicted"], [{"gang_name": "gang", "pod_uids": ["uid-g1", "uid-g2"]}])
+        self.assertEqual(result["delta"]["moved"], [])
+    
+    def test_resync_delta_reports_moved_pod(self):
+        """Test that a pod observed on another node is reported as moved."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-2", "pod-2", priority=5, node_name="node-2")
+        ])
+        bind = logic.handle_event({"event_type": "ADDED",
+                                   "pod": self._create_pod_dict("uid-1", "pod-1", priority=10)})["actions"][0]
+        
+        result = logic.handle_action_results([{
+            "action": bind, "success": False, "status": 409,
+            "observed_pod": self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-2")
+        }])
+        
+        self.assertEqual(result["delta"]["moved"], [{"pod_uid": "uid-1", "from_node": "node-1", "to_node": "node-2"}])
+        self.assertEqual(result["delta"]["evicted"], [{"gang_name": None, "pod_uids": ["uid-2"]}])
+        self.assertGreater(result["plan_version"], bind["plan_version"])
+    
+    def test_initialize_continues_from_plan_version(self):
+        """Test that a re-initialized logic hands out versions newer than the previous state's."""
+        logic = SchedulingLogic()
+        result = logic.initialize(["node-1"], [self._create_pod_dict("uid-1", "pod-1")], (), 7)
+        
+        self.assertEqual(result["plan_version"], 8)
+        self.assertEqual(result["actions"][0]["plan_version"], 8)
+    
+    def test_cancelled_preempt_plans_pod_again(self):
+        """Test that a preempt reported as cancelled puts its never-bound pod back to pending."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1"], [self._create_pod_dict("uid-1", "pod-1", priority=10)])
+        
+        preempt, bind = logic.handle_event({"event_type": "ADDED",
+                                            "pod": self._create_pod_dict("uid-2", "pod-2", priority=100)})["actions"]
+        self.assertEqual((preempt["action"], preempt["pod_uid"]), ("preempt", "uid-1"))
+        self.assertEqual((bind["action"], bind["pod_uid"]), ("bind", "uid-2"))
+        
+        # pod-1 was never bound, so it waits in the queue instead of on its deletion
+        result = logic.handle_action_results([{"action": preempt, "success": False, "cancelled": True}])
+        
+        self.assertEqual(result["actions"], [])
+        self.assertFalse(logic.all_pods["uid-1"].waiting_on_deletion)
+        self.assertIn("uid-1", [p.uid for u in logic.scheduling_queue for p in u.pods])
+        
+        # Once pod-2 is gone, pod-1 is planned again
+        result = logic.handle_event({"event_type": "DELETED",
+                                     "pod": self._create_pod_dict("uid-2", "pod-2", priority=100)})
+        self.assertEqual([(a["action"], a["pod_uid"]) for a in result["actions"]], [("bind", "uid-1")])
+
+
+class TestNodeLifecycle(PodFixtures, unittest.TestCase):
+    """Test cases for NODE_ADDED / NODE_CORDONED / NODE_REMOVED events."""
+    
+    def _node_event(self, event_type, node_name):
+        """Create a node event dict."""
+        return {"event_type": event_type, "node_name": node_name}
+    
+    def test_added_node_takes_pending_pod(self):
+        """Test that a new node is used by a pod that did not fit before."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1"], [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1"),
+            self._create_pod_dict("uid-2", "pod-2", priority=10),
+        ])
+        
+        result = logic.handle_event(self._node_event("NODE_ADDED", "node-2"))
+        
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in result["actions"]],
+                         [("bind", "uid-2", "node-2")])
+        
+        # A duplicate add changes nothing
+        self.assertFalse(logic._apply_event(self._node_event("NODE_ADDED", "node-2")))
+    
+    def test_initialize_keeps_pods_on_cordoned_nodes(self):
+        """Test that nodes cordoned at startup keep their running pods as cordoned slots."""
+        logic = SchedulingLogic()
+        result = logic.initialize({"node-1": 2, "node-2": 1}, [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1"),
+            self._create_pod_dict("uid-2", "pod-2", priority=10),
+            self._create_pod_dict("uid-3", "pod-3", priority=10),
+        ], ["node-1"])
+        
+        # Only node-2 takes new pods; pod-1 is not rebound
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in result["actions"]],
+                         [("bind", "uid-2", "node-2")])
+        self.assertEqual(logic.pod_nodes["uid-1"], "node-1#0")
+        self.assertEqual(logic.cordoned_slots, {"node-1#0"})
+        self.assertNotIn("node-1#1", logic.node_assignments)
+        
+        # Uncordoning makes the node's free slot available again
+        result = logic.handle_event({"event_type": "NODE_ADDED", "node_name": "node-1", "slots": 2})
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in result["actions"]],
+                         [("bind", "uid-3", "node-1")])
+        self.assertEqual(logic.cordoned_slots, set())
+    
+    def test_added_node_adopts_pods_seen_on_it(self):
+        """Test that pods running on a node before it is managed take its slots when it is added."""
+        logic = SchedulingLogic()
+        result = logic.initialize(["node-1"], [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-2"),
+            self._create_pod_dict("uid-2", "pod-2", gang_name="gang-a", node_name="node-3"),
+            self._create_pod_dict("uid-3", "pod-3", gang_name="gang-a"),
+        ])
+        
+        # Neither pod-1 nor the gang with a member elsewhere is planned
+        self.assertEqual(result["actions"], [])
+        self.assertEqual(logic.unmanaged_pods, {"uid-1": "node-2", "uid-2": "node-3"})
+        
+        result = logic.handle_event(self._node_event("NODE_ADDED", "node-2"))
+        self.assertEqual(result["actions"], [])
+        self.assertEqual(logic.node_assignments["node-2"], "uid-1")
+        
+        result = logic.handle_event(self._node_event("NODE_ADDED", "node-3"))
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in result["actions"]],
+                         [("bind", "uid-3", "node-1")])
+        self.assertEqual(logic.unmanaged_pods, {})
+    
+    def test_cordoned_node_keeps_its_pod_but_takes_no_new_ones(self):
+        """Test that cordoning never preempts, and the node leaves capacity once empty."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1"),
+        ])
+        
+        result = logic.handle_events([
+            self._node_event("NODE_CORDONED", "node-1"),
+            self._node_event("NODE_CORDONED", "node-2"),
+        ])
+        self.assertEqual(result["actions"], [])
+        self.assertEqual(logic.node_assignments, {"node-1": "uid-1"})
+        
+        logic.handle_event({"event_type": "DELETED", "pod": self._create_pod_dict("uid-1", "pod-1", priority=10)})
+        result = logic.handle_event({"event_type": "ADDED", "pod": self._create_pod_dict("uid-2", "pod-2", priority=10)})
+        
+        self.assertEqual(result["actions"], [])
+        self.assertEqual(logic.node_assignments, {})
+    
+    def test_uncordon_restores_node(self):
+        """Test that NODE_ADDED for a cordoned node makes it schedulable again."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1"], [self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1")])
+        logic.handle_event(self._node_event("NODE_CORDONED", "node-1"))
+        logic.handle_event(self._node_event("NODE_ADDED", "node-1"))
+        
+        logic.handle_event({"event_type": "DELETED", "pod": self._create_pod_dict("uid-1", "pod-1", priority=10)})
+        result = logic.handle_event({"event_type": "ADDED", "pod": self._create_pod_dict("uid-2", "pod-2", priority=10)})
+        
+        self.assertEqual([(a["action"], a["node_name"]) for a in result["actions"]], [("bind", "node-1")])
+    
+    def test_preempting_cordoned_pod_does_not_overcommit(self):
+        """Test that a plan does not count a cordoned node whose pod it evicts."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-low", "low", priority=10, node_name="node-1"),
+            self._create_pod_dict("uid-mid", "mid", priority=50, node_name="node-2"),
+        ])
+        logic.handle_event(self._node_event("NODE_CORDONED", "node-1"))
+        
+        result = logic.handle_event({"event_type": "ADDED",
+                                     "pod": self._create_pod_dict("uid-high", "high", priority=100)})
+        
+        # Only node-2 is left once the cordoned pod goes, so only the high pod fits
+        self.assertEqual(sorted((a["action"], a["pod_uid"], a["node_name"]) for a in result["actions"]), [
+            ("bind", "uid-high", "node-2"),
+            ("preempt", "uid-low", "node-1"),
+            ("preempt", "uid-mid", "node-2"),
+        ])
+        self.assertEqual(logic.node_assignments, {"node-2": "uid-high"})
+    
+    def test_cordon_reserve_does_not_hide_free_nodes(self):
+        """Test that a node the cordon reserve held back is used by the next pending pod."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1", "node-2", "node-3"], [
+            self._create_pod_dict("uid-low", "low", priority=0, node_name="node-1"),
+            self._create_pod_dict("uid-s", "s", priority=9, node_name="node-2"),
+            self._create_pod_dict("uid-ga", "g-a", priority=5, gang_name="gang", node_name="node-3"),
+        ])
+        logic.handle_event(self._node_event("NODE_CORDONED", "node-1"))
+    
+        # The grown gang no longer fits next to the cordoned pod, so it is preempted
+        result = logic.handle_event({"event_type": "ADDED",
+                                     "pod": self._create_pod_dict("uid-gb", "g-b", priority=5, gang_name="gang")})
+        self.assertEqual([(a["action"], a["pod_uid"]) for a in result["actions"]], [("preempt", "uid-ga")])
+        self.assertIsNone(logic.node_assignments["node-3"])
+    
+        result = logic.handle_event({"event_type": "ADDED",
+                                     "pod": self._create_pod_dict("uid-late", "late", priority=0)})
+    
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in result["actions"]],
+                         [("bind", "uid-late", "node-3")])
+        self.assertEqual(logic.skipped_replans, 0)
+    
+    def test_removed_node_drops_capacity_and_its_pod(self):
+        """Test that a removed node's pod waits on deletion and the node is never bound again."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-g1", "g1", priority=10, gang_name="gang", node_name="node-1"),
+            self._create_pod_dict("uid-g2", "g2", priority=10, gang_name="gang", node_name="node-2"),
+        ])
+        
+        result = logic.handle_event(self._node_event("NODE_REMOVED", "node-1"))
+        
+        # The rest of the gang is preempted so the gang can be reformed
+        self.assertEqual([(a["action"], a["pod_uid"]) for a in result["actions"]], [("preempt", "uid-g2")])
+        self.assertTrue(logic.all_pods["uid-g1"].waiting_on_deletion)
+        self.assertEqual(list(logic.node_assignments), ["node-2"])
+        self.assertEqual(result["delta"]["evicted"], [{"gang_name": "gang", "pod_uids": ["uid-g1", "uid-g2"]}])
+        
+        # Removing an unknown node is ignored
+        self.assertFalse(logic._apply_event(self._node_event("NODE_REMOVED", "node-9")))
+
+
+class TestNodeSlots(PodFixtures, unittest.TestCase):
+    """Test cases for nodes with more than one pod slot."""
+    
+    def test_capacity_counts_slots(self):
+        """Test that a multi-slot node takes several pods and binds name the node, not the slot."""
+        logic = SchedulingLogic()
+        result = logic.initialize({"node-a": 3, "node-b": 1}, [
+            self._create_pod_dict(f"uid-{i}", f"pod-{i}", priority=10) for i in range(5)
+        ])
+        
+        self.assertEqual([(a["pod_uid"], a["node_name"]) for a in result["actions"]], [
+            ("uid-0", "node-a"), ("uid-1", "node-a"), ("uid-2", "node-a"), ("uid-3", "node-b"),
+        ])
+        self.assertEqual(logic.node_assignments, {
+            "node-a#0": "uid-0", "node-a#1": "uid-1", "node-a#2": "uid-2", "node-b": "uid-3"
+        })
+        self.assertNotIn("uid-4", logic.pod_nodes)
+    
+    def test_existing_pods_fill_distinct_slots(self):
+        """Test that pods already running on a multi-slot node each take their own slot."""
+        logic = SchedulingLogic()
+        logic.initialize({"node-a": 2}, [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-a"),
+            self._create_pod_dict("uid-2", "pod-2", priority=10, node_name="node-a"),
+        ])
+        
+        self.assertEqual(logic.node_assignments, {"node-a#0": "uid-1", "node-a#1": "uid-2"})
+        
+        # A higher-priority pod preempts one of them on the node
+        result = logic.handle_event({"event_type": "ADDED",
+                                     "pod": self._create_pod_dict("uid-3", "pod-3", priority=100)})
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in result["actions"]],
+                         [("preempt", "uid-2", "node-a"), ("bind", "uid-3", "node-a")])
+    
+    def test_failed_bind_frees_its_slot(self):
+        """Test that reverting a failed bind on a multi-slot node frees the pod's slot for the retry."""
+        logic = SchedulingLogic()
+        bind = logic.initialize({"node-a": 2}, [self._create_pod_dict("uid-1", "pod-1", priority=10)])["actions"][0]
+        
+        result = logic.handle_action_results([{"action": bind, "success": False, "status": 500}])
+        
+        self.assertEqual([(a["action"], a["node_name"]) for a in result["actions"]], [("bind", "node-a")])
+        self.assertEqual(logic.node_assignments, {"node-a#0": "uid-1", "node-a#1": None})
+    
+    def test_node_events_cover_all_slots(self):
+        """Test that node events add, cordon and remove every slot of a node."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1"], [self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1")])
+        
+        result = logic.handle_events([
+            {"event_type": "NODE_ADDED", "node_name": "node-2", "slots": 2},
+            {"event_type": "ADDED", "pod": self._create_pod_dict("uid-2", "pod-2", priority=10)},
+        ])
+        self.assertEqual([(a["pod_uid"], a["node_name"]) for a in result["actions"]], [("uid-2", "node-2")])
+        
+        # Cordoning drops the free slot at once and keeps the running pod
+        logic.handle_event({"event_type": "NODE_CORDONED", "node_name": "node-2"})
+        self.assertEqual(logic.node_assignments, {"node-1": "uid-1", "node-2#0": "uid-2"})
+        
+        logic.handle_event({"event_type": "NODE_REMOVED", "node_name": "node-2"})
+        self.assertEqual(logic.node_assignments, {"node-1": "uid-1"})
+        self.assertTrue(logic.all_pods["uid-2"].waiting_on_deletion)
+    
+    def test_slot_count_change_keeps_running_pods(self):
+        """Test that a node whose slot count changes keeps its occupied slots."""
+        logic = SchedulingLogic()
+        logic.initialize({"node-a": 3}, [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-a"),
+            self._create_pod_dict("uid-2", "pod-2", priority=10, node_name="node-a"),
+        ])
+    
+        # Shrinking to one slot drops the free slot and cordons a running pod's slot
+        logic.handle_event({"event_type": "NODE_ADDED", "node_name": "node-a", "slots": 1})
+        self.assertEqual(logic.node_assignments, {"node-a#0": "uid-1", "node-a#1": "uid-2"})
+        self.assertEqual(logic.cordoned_slots, {"node-a#1"})
+    
+        result = logic.handle_event({"event_type": "ADDED",
+                                     "pod": self._create_pod_dict("uid-3", "pod-3", priority=10)})
+        self.assertEqual(result["actions"], [])
+    
+        # The cordoned slot is gone with its pod; growing again adds fresh slots next to uid-1
+        result = logic.handle_events([
+            {"event_type": "DELETED", "pod": self._create_pod_dict("uid-2", "pod-2", node_name="node-a")},
+            {"event_type": "NODE_ADDED", "node_name": "node-a", "slots": 2},
+        ])
+        self.assertEqual([(a["pod_uid"], a["node_name"]) for a in result["actions"]], [("uid-3", "node-a")])
+        self.assertEqual(logic.node_assignments, {"node-a#0": "uid-1", "node-a#1": "uid-3"})
+    
+    def test_restore_keeps_pods_when_slot_count_changes(self):
+        """Test that restore matches snapshot slots to nodes, not to slot keys."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-a"], [self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-a")])
+        
+        restored = SchedulingLogic()
+        result = restored.restore(json.loads(json.dumps(logic.to_snapshot())), {"node-a": 2})
+        
+        self.assertEqual(result["actions"], [])
+        self.assertEqual(restored.node_assignments, {"node-a#0": "uid-1", "node-a#1": None})
+
+
+class TestStateSnapshot(PodFixtures, unittest.TestCase):
+    """Test cases for SchedulingLogic.to_snapshot / restore."""
+    
+    def test_restore_round_trip(self):
+        """Test that a restored logic has the same state and plans like the original."""
+        nodes = ["node-1", "node-2", "node-3"]
+        logic = SchedulingLogic()
+        logic.initialize(nodes, [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1"),
+            self._create_pod_dict("uid-g1", "g1", priority=50, gang_name="gang", node_name="node-2"),
+            self._create_pod_dict("uid-g2", "g2", priority=50, gang_name="gang", node_name="node-3"),
+        ])
+        
+        # Preempt pod-1 so a waiting-on-deletion pod is part of the snapshot
+        logic.handle_event({"event_type": "ADDED", "pod": self._create_pod_dict("uid-2", "pod-2", priority=100)})
+        self.assertTrue(logic.all_pods["uid-1"].waiting_on_deletion)
+        
+        snapshot = json.loads(json.dumps(logic.to_snapshot()))
+        restored = SchedulingLogic()
+        result = restored.restore(snapshot, nodes)
+        
+        self.assertEqual(result["actions"], [])
+        self.assertGreaterEqual(result["plan_version"], logic.plan_version)
+        self.assertEqual(restored.node_assignments, logic.node_assignments)
+        self.assertEqual(restored.pod_nodes, logic.pod_nodes)
+        self.assertEqual(restored.all_pods, logic.all_pods)
+        self.assertEqual([u.pods for u in restored.scheduling_queue], [u.pods for u in logic.scheduling_queue])
+        
+        # Both instances react to the same event identically
+        # (plan versions are per instance, so compare without them)
+        event = {"event_type": "DELETED", "pod": self._create_pod_dict("uid-1", "pod-1", priority=10)}
+        restored_actions = restored.handle_event(dict(event))["actions"]
+        actions = logic.handle_event(dict(event))["actions"]
+        for action in restored_actions + actions:
+            del action["plan_version"]
+        self.assertEqual(restored_actions, actions)
+    
+    def test_restore_keeps_pods_on_unmanaged_nodes_out_of_planning(self):
+        """Test that pods on unmanaged nodes are not bound again after a restore."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1"], [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="other-1"),
+            self._create_pod_dict("uid-2", "pod-2", priority=10, node_name="other-2"),
+        ])
+        snapshot = json.loads(json.dumps(logic.to_snapshot()))
+        
+        restored = SchedulingLogic()
+        result = restored.restore(snapshot, ["node-1", "other-2"])
+        
+        # other-2 is managed now and adopts pod-2; pod-1 stays unplanned
+        self.assertEqual(result["actions"], [])
+        self.assertEqual(restored.unmanaged_pods, {"uid-1": "other-1"})
+        self.assertEqual(restored.pod_nodes, {"uid-2": "other-2"})
+    
+    def test_restore_plans_pending_pods_and_drops_missing_nodes(self):
+        """Test that restore frees assignments on vanished nodes and schedules pending pods."""
+        logic = SchedulingLogic()
+        logic.initialize(["node-1", "node-2"], [
+            self._create_pod_dict("uid-1", "pod-1", priority=10, node_name="node-1"),
+            self._create_pod_dict("uid-2", "pod-2", priority=20, node_name="node-2"),
+        ])
+        
+        restored = SchedulingLogic()
+        result = restored.restore(logic.to_snapshot(), ["node-2", "node-3"])
+        
+        self.assertEqual(restored.node_assignments["node-2"], "uid-2")
+        self.assertEqual([(a["action"], a["pod_uid"], a["node_name"]) for a in result["actions"]],
+                         [("bind", "uid-1", "node-3")])
+    
+    def test_restore_rejects_unknown_format(self):
+        """Test that snapshots of another format version are rejected."""
+        snapshot = SchedulingLogic().to_snapshot()
+        snapshot["format_version"] = -1
+        
+        with self.assertRaises(ValueError):
+            SchedulingLogic().restore(snapshot, ["node-1"])
+
+
+class TestSchedulingIntegration(PodFixtures, unittest.TestCase):
+    """Integration tests for complex scheduling scenarios."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.logic = SchedulingLogic()
     
     def test_cluster_full_priority_scheduling(self):
         """Test priority-based scheduling when cluster is at capacity."""
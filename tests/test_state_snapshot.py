@@ -0,0 +1,61 @@
+"""
+Unit tests for the state snapshot store.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scheduler'))
+
+from state_snapshot import StateSnapshotStore
+
+
+class TestStateSnapshotStore(unittest.TestCase):
+    """Test cases for StateSnapshotStore."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "state", "snapshot.json")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_save_and_load_round_trip(self):
+        """Test that a saved snapshot loads back with its resourceVersion."""
+        store = StateSnapshotStore(self.path)
+        state = {"format_version": 1, "node_assignments": {"node-1": "uid-1"}, "pods": [], "gangs_in_transition": []}
+        
+        store.save(state, "12345")
+        
+        self.assertEqual(store.load(), (state, "12345"))
+        self.assertEqual(store.writes, 1)
+        self.assertFalse(os.path.exists(f"{self.path}.tmp"))
+    
+    def test_save_replaces_previous_snapshot(self):
+        """Test that the latest save wins."""
+        store = StateSnapshotStore(self.path)
+        store.save({"pods": [1]}, "1")
+        store.save({"pods": [2]}, "2")
+        
+        self.assertEqual(store.load(), ({"pods": [2]}, "2"))
+    
+    def test_missing_snapshot(self):
+        """Test that a missing file means no snapshot."""
+        self.assertIsNone(StateSnapshotStore(self.path).load())
+    
+    def test_corrupt_snapshot_is_ignored(self):
+        """Test that a torn or malformed file is ignored instead of raising."""
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write('{"resource_version": "1", "sta')
+        self.assertIsNone(StateSnapshotStore(self.path).load())
+        
+        with open(self.path, "w") as f:
+            json.dump({"state": {}}, f)
+        self.assertIsNone(StateSnapshotStore(self.path).load())
+
+
+if __name__ == '__main__':
+    unittest.main()